@@ -1,27 +1,33 @@
 import time
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
 
 from config import *
 from models import *
 from connection import *
+from head import conditional_headers, fetch_meta, read_head, revalidated, unchanged
+from polite import check_throttled, crawl_async
+from writer import page_validators, page_writer, touch_pages
 
 
-async def fetch(session, url):
-    async with session.get(url) as response:
-        return url, await response.text()
+async def fetch(session, url, known):
+    async with session.get(url, headers=conditional_headers(known)) as response:
+        if response.status == 304:
+            return None, response.headers
+        check_throttled(url, response.status, response.headers)
+        return await read_head(response), response.headers
 
 
-async def parse_and_save(session, url):
-    url, html = await fetch(session, url)
-    soup = BeautifulSoup(html, "html.parser")
-    title = soup.title.string.strip() if soup.title else "No title"
+async def parse_and_save(session, url, known):
+    head, headers = await fetch(session, url, known)
+    if head is None:
+        return {"url": url, **revalidated(known, headers)}
+    digest = head.digest()
+    if unchanged(known, digest):
+        return {"url": url, **revalidated(known, headers)}
+    title, _ = head.result()
 
-    with get_session() as session:
-        page = Page(url=url, title=title)
-        session.merge(page)
-        session.commit()
+    page_writer.add(Page(url=url, title=title or "No title", **fetch_meta(headers, digest)))
 
 
 async def main():
@@ -30,8 +36,16 @@ async def main():
     start = time.time()
 
     async with aiohttp.ClientSession() as session:
-        tasks = [parse_and_save(session, url) for url in URLS]
-        await asyncio.gather(*tasks)
+        known = page_validators(URLS)
+        results = await crawl_async(session, URLS, lambda url: parse_and_save(session, url, known.get(url)))
+    page_writer.close()
+    touched = [result for result in results if isinstance(result, dict)]
+    if touched:
+        touch_pages(touched)
+
+    for url, result in zip(URLS, results):
+        if isinstance(result, Exception):
+            print(f"Ошибка {url}: {result!r}")
 
     print(f"Время: {time.time() - start:.2f} сек")
 
@@ -1,22 +1,48 @@
 import time
 import requests
-from bs4 import BeautifulSoup
-from multiprocessing import Process
+from multiprocessing import Pipe, Process
 
 from config import *
 from models import *
 from connection import *
+from head import conditional_headers, fetch_meta, read_head_sync, revalidated, unchanged
+from polite import check_throttled, crawl_threads
+from writer import page_validators, page_writer, touch_pages
 
 
-def parse_and_save(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = soup.title.string.strip() if soup.title else "No title"
+def fetch_page(url, known):
+    response = requests.get(url, headers=conditional_headers(known), stream=True)
+    if response.status_code == 304:
+        response.close()
+        return revalidated(known, response.headers)
+    check_throttled(url, response.status_code, response.headers)
+    head = read_head_sync(response)
+    digest = head.digest()
+    if unchanged(known, digest):
+        return revalidated(known, response.headers)
+    title, _ = head.result()
+    return {"title": title or "No title", **fetch_meta(response.headers, digest)}
 
-    with get_session() as session:
-        page = Page(url=url, title=title)
-        session.merge(page)
-        session.commit()
+
+def parse_page(url, known, sender):
+    try:
+        sender.send((fetch_page(url, known), None))
+    except Exception as e:
+        sender.send((None, e))
+
+
+def run_process(url, known):
+    receiver, sender = Pipe(duplex=False)
+    p = Process(target=parse_page, args=(url, known, sender))
+    p.start()
+    sender.close()
+    try:
+        page, error = receiver.recv()
+    finally:
+        p.join()
+    if error is not None:
+        raise error
+    return page
 
 
 def main():
@@ -24,14 +50,20 @@ def main():
 
     start = time.time()
 
-    processes = []
-    for url in URLS:
-        p = Process(target=parse_and_save, args=(url,))
-        p.start()
-        processes.append(p)
+    known = page_validators(URLS)
+    results = crawl_threads(URLS, lambda url: run_process(url, known.get(url)))
 
-    for p in processes:
-        p.join()
+    touched = []
+    with page_writer:
+        for url, page in zip(URLS, results):
+            if isinstance(page, Exception):
+                print(f"Ошибка {url}: {page!r}")
+            elif "title" in page:
+                page_writer.add(Page(url=url, **page))
+            else:
+                touched.append({"url": url, **page})
+    if touched:
+        touch_pages(touched)
 
     print(f"Время: {time.time() - start:.2f} сек")
 
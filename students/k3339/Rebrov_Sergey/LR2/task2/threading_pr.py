@@ -1,22 +1,27 @@
 import time
 import requests
-import threading
-from bs4 import BeautifulSoup
 
 from config import *
 from models import *
 from connection import *
+from head import conditional_headers, fetch_meta, read_head_sync, revalidated, unchanged
+from polite import check_throttled, crawl_threads
+from writer import page_validators, page_writer, touch_pages
 
 
-def parse_and_save(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = soup.title.string.strip() if soup.title else "No title"
+def parse_and_save(url, known):
+    response = requests.get(url, headers=conditional_headers(known), stream=True)
+    if response.status_code == 304:
+        response.close()
+        return {"url": url, **revalidated(known, response.headers)}
+    check_throttled(url, response.status_code, response.headers)
+    head = read_head_sync(response)
+    digest = head.digest()
+    if unchanged(known, digest):
+        return {"url": url, **revalidated(known, response.headers)}
+    title, _ = head.result()
 
-    with get_session() as session:
-        page = Page(url=url, title=title)
-        session.merge(page)
-        session.commit()
+    page_writer.add(Page(url=url, title=title or "No title", **fetch_meta(response.headers, digest)))
 
 
 def main():
@@ -24,14 +29,16 @@ def main():
 
     start = time.time()
 
-    threads = []
-    for url in URLS:
-        t = threading.Thread(target=parse_and_save, args=(url,))
-        t.start()
-        threads.append(t)
+    known = page_validators(URLS)
+    results = crawl_threads(URLS, lambda url: parse_and_save(url, known.get(url)))
+    page_writer.close()
+    touched = [result for result in results if isinstance(result, dict)]
+    if touched:
+        touch_pages(touched)
 
-    for t in threads:
-        t.join()
+    for url, result in zip(URLS, results):
+        if isinstance(result, Exception):
+            print(f"Ошибка {url}: {result!r}")
 
     print(f"Время: {time.time() - start:.2f} сек")
 
@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from connection import engine
+from models import Page
+
+PAGE_BATCH_SIZE = int(os.getenv("PAGE_BATCH_SIZE", "100"))
+PAGE_FLUSH_INTERVAL = float(os.getenv("PAGE_FLUSH_INTERVAL", "1"))
+
+logger = logging.getLogger(__name__)
+
+
+def page_validators(urls):
+    statement = select(Page.url, Page.etag, Page.last_modified, Page.content_hash).where(Page.url.in_(urls))
+    with engine.connect() as conn:
+        return {row.url: row._asdict() for row in conn.execute(statement)}
+
+
+def upsert_pages(rows):
+    insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(Page).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["url"],
+        set_={
+            column.name: statement.excluded[column.name]
+            for column in Page.__table__.columns
+            if column.name not in ("id", "url")
+        },
+    )
+    with engine.begin() as conn:
+        conn.execute(statement)
+
+
+def touch_pages(rows):
+    statement = update(Page).where(Page.url == bindparam("page_url")).values(
+        etag=bindparam("page_etag"),
+        last_modified=bindparam("page_last_modified"),
+        fetched_at=bindparam("page_fetched_at"),
+    )
+    params = [{f"page_{name}": value for name, value in row.items()} for row in rows]
+    with engine.begin() as conn:
+        conn.execute(statement, params)
+
+
+class PageWriter:
+    def __init__(self, batch_size=PAGE_BATCH_SIZE, interval=PAGE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.rows = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.try_flush()
+
+    def try_flush(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Page flush failed")
+
+    def add(self, page):
+        self.start()
+        row = page.model_dump(exclude={"id"})
+        with self.lock:
+            self.rows[row["url"]] = row
+            full = len(self.rows) >= self.batch_size
+        if full:
+            self.try_flush()
+
+    def flush(self):
+        with self.lock:
+            rows, self.rows = list(self.rows.values()), {}
+        if not rows:
+            return
+        try:
+            upsert_pages(rows)
+        except Exception:
+            with self.lock:
+                for row in rows:
+                    self.rows.setdefault(row["url"], row)
+            raise
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+page_writer = PageWriter()
@@ -0,0 +1,138 @@
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from sqlalchemy.orm import selectinload
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from models import *
+
+BENCH_DB = os.getenv("BENCH_DB", "sqlite:///benchmark.db")
+EVALUATIONS = int(os.getenv("BENCH_EVALUATIONS", "1000000"))
+PARTICIPANTS = 2000
+TEAMS = 500
+CHALLENGES = 20
+JUDGES_PER_SUBMISSION = 20
+REPEATS = 50
+BATCH = 10000
+
+INDEXES = [
+    "ix_participantteamlink_team_id",
+    "ix_submission_team_id",
+    "ix_submission_submitted_at",
+    "ix_submission_group",
+    "ix_evaluation_judge_id",
+    "ix_evaluation_evaluated_at",
+    "ux_evaluation_submission_judge",
+]
+
+START = datetime(2025, 1, 1)
+
+
+def batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def populate(engine):
+    submissions = EVALUATIONS // JUDGES_PER_SUBMISSION
+    tables = [
+        (Participant, ({"name": f"p{i}", "email": f"p{i}@example.com", "updated_at": START} for i in range(PARTICIPANTS))),
+        (Team, ({"name": f"t{i}", "updated_at": START} for i in range(TEAMS))),
+        (ParticipantTeamLink, (
+            {"participant_id": i + 1, "team_id": i % TEAMS + 1, "joined_at": START} for i in range(PARTICIPANTS)
+        )),
+        (Challenge, ({"title": f"c{i}", "updated_at": START} for i in range(CHALLENGES))),
+        (Submission, ({
+            "team_id": random.randint(1, TEAMS),
+            "challenge_id": random.randint(1, CHALLENGES),
+            "file_url": f"https://example.com/{i}",
+            "submitted_at": START + timedelta(seconds=random.randint(0, 30 * 86400)),
+            "updated_at": START,
+        } for i in range(submissions))),
+        (Evaluation, ({
+            "submission_id": i % submissions + 1,
+            "judge_id": (i // submissions * 97 + i % submissions) % PARTICIPANTS + 1,
+            "score": random.randint(0, 100),
+            "evaluated_at": START + timedelta(seconds=random.randint(0, 30 * 86400)),
+            "updated_at": START,
+        } for i in range(EVALUATIONS))),
+    ]
+    with engine.begin() as conn:
+        for model, rows in tables:
+            for batch in batches(rows):
+                conn.execute(insert(model), batch)
+    return submissions
+
+
+def set_indexes(engine, enabled):
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in INDEXES:
+                    if enabled:
+                        index.create(conn, checkfirst=True)
+                    else:
+                        index.drop(conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+
+
+def queries(submissions):
+    window = START + timedelta(days=random.randint(0, 29))
+    page = random.sample(range(1, submissions + 1), 20)
+    return {
+        "Team.participants": select(Team).where(Team.id == random.randint(1, TEAMS))
+        .options(selectinload(Team.participants)),
+        "Team.submissions": select(Team).where(Team.id == random.randint(1, TEAMS))
+        .options(selectinload(Team.submissions)),
+        "Submission.evaluations": select(Submission).where(Submission.id.in_(page))
+        .options(selectinload(Submission.evaluations)),
+        "Participant.evaluations": select(Participant).where(Participant.id == random.randint(1, PARTICIPANTS))
+        .options(selectinload(Participant.evaluations)),
+        "Submission по челленджу": select(Submission)
+        .where(Submission.challenge_id == random.randint(1, CHALLENGES))
+        .where(Submission.team_id == random.randint(1, TEAMS))
+        .order_by(Submission.submitted_at.desc()),
+        "Evaluation за час": select(Evaluation)
+        .where(Evaluation.evaluated_at >= window)
+        .where(Evaluation.evaluated_at < window + timedelta(hours=1)),
+    }
+
+
+def measure(engine, submissions):
+    totals = {}
+    random.seed(1)
+    for _ in range(REPEATS):
+        for name, statement in queries(submissions).items():
+            with Session(engine) as session:
+                start = time.perf_counter()
+                session.exec(statement).all()
+                totals[name] = totals.get(name, 0) + time.perf_counter() - start
+    return {name: total / REPEATS * 1000 for name, total in totals.items()}
+
+
+if __name__ == "__main__":
+    engine = create_engine(BENCH_DB)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    set_indexes(engine, False)
+
+    start_time = time.time()
+    submissions = populate(engine)
+    print(f"Заполнение {EVALUATIONS} оценок: {time.time() - start_time:.2f} сек")
+
+    before = measure(engine, submissions)
+    start_time = time.time()
+    set_indexes(engine, True)
+    print(f"Построение индексов: {time.time() - start_time:.2f} сек")
+    after = measure(engine, submissions)
+
+    for name in before:
+        print(f"{name:<26} без индексов: {before[name]:9.2f} мс  с индексами: {after[name]:9.2f} мс")
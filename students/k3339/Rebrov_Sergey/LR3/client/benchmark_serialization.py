@@ -0,0 +1,73 @@
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from cache import render, render_rows
+from loaders import flat_columns, serialize
+from models import *
+
+BENCH_DB = os.getenv("BENCH_DB", "sqlite:///benchmark.db")
+SUBMISSIONS = int(os.getenv("BENCH_SUBMISSIONS", "100000"))
+REPEATS = 3
+
+START = datetime(2025, 1, 1)
+SCHEMA = List[SubmissionRead]
+
+
+def populate(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Team), [{"name": "t", "updated_at": START}])
+        conn.execute(insert(Challenge), [{"title": "c", "updated_at": START}])
+        conn.execute(insert(Submission), [{
+            "team_id": 1,
+            "challenge_id": 1,
+            "file_url": f"https://example.com/{i}",
+            "submitted_at": START + timedelta(seconds=random.randint(0, 30 * 86400)),
+            "updated_at": START,
+        } for i in range(SUBMISSIONS)])
+
+
+def orm_path(engine):
+    with Session(engine) as session:
+        rows = session.exec(select(Submission).order_by(Submission.id)).all()
+        return render(SCHEMA, [serialize(row, {}) for row in rows], None, True)
+
+
+def flat_path(engine):
+    columns = flat_columns(Submission, SubmissionRead)
+    with Session(engine) as session:
+        rows = session.execute(select(*columns).order_by(Submission.id)).all()
+        return render_rows(SCHEMA, [column.name for column in columns], rows)
+
+
+def measure(path, engine):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        path(engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    body = path(engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return SUBMISSIONS / best, peak / 2 ** 20, body
+
+
+if __name__ == "__main__":
+    engine = create_engine(BENCH_DB)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    populate(engine)
+
+    results = {}
+    for name, path in (("ORM + SubmissionRead", orm_path), ("колонки + orjson", flat_path)):
+        rows_per_second, peak, body = measure(path, engine)
+        results[name] = body
+        print(f"{name:<22} {rows_per_second:12.0f} строк/сек  пик памяти: {peak:8.1f} МБ")
+    print(f"Ответы совпадают: {len(set(results.values())) == 1}")
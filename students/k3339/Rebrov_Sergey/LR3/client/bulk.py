@@ -0,0 +1,177 @@
+import os
+from collections import namedtuple
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import select
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+Link = namedtuple("Link", "field model own_key other_key target")
+Hook = namedtuple("Hook", "before after")
+
+
+async def read_rows(request):
+    if "ndjson" in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array")
+    for row in body:
+        yield row
+
+
+def validate(schema, raw):
+    if isinstance(raw, bytes):
+        return schema.model_validate_json(raw)
+    return schema.model_validate(raw)
+
+
+def defaults(model):
+    return {
+        name: field.default_factory()
+        for name, field in model.model_fields.items()
+        if field.default_factory is not None
+    }
+
+
+async def existing_ids(session, model, ids):
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return set()
+    return set((await session.exec(select(model.id).where(model.id.in_(ids)))).all())
+
+
+def unique_keys(model):
+    return [list(index.columns) for index in model.__table__.indexes if index.unique]
+
+
+async def check_unique(session, batch, model, columns, errors):
+    names = [column.name for column in columns]
+    keys = {}
+    for index, row in batch:
+        key = tuple(getattr(row, name) for name in names)
+        if index not in errors and None not in key:
+            keys[index] = key
+    if not keys:
+        return
+    rows = await session.exec(select(model.id, *columns).where(tuple_(*columns).in_(set(keys.values()))))
+    owners = {tuple(key): object_id for object_id, *key in rows.all()}
+    claimed = set()
+    for index, row in batch:
+        key = keys.get(index)
+        if key is None:
+            continue
+        if owners.get(key, row.id) != row.id:
+            errors[index] = f"{model.__name__} with {', '.join(names)} {key} already exists"
+        elif key in claimed:
+            errors[index] = f"Duplicate {', '.join(names)} {key} in batch"
+        else:
+            claimed.add(key)
+
+
+async def check_batch(session, batch, model, references, link):
+    errors = {}
+    found = await existing_ids(session, model, (row.id for _, row in batch))
+    for index, row in batch:
+        if row.id is not None and row.id not in found:
+            errors[index] = f"{model.__name__} {row.id} not found"
+    for field, target in references.items():
+        found = await existing_ids(session, target, (getattr(row, field) for _, row in batch))
+        for index, row in batch:
+            if getattr(row, field) not in found:
+                errors.setdefault(index, f"{target.__name__} {getattr(row, field)} not found")
+    if link:
+        found = await existing_ids(session, link.target, (i for _, row in batch for i in getattr(row, link.field) or []))
+        for index, row in batch:
+            missing = sorted(set(getattr(row, link.field) or []) - found)
+            if missing:
+                errors.setdefault(index, f"{link.target.__name__} not found: {missing}")
+    for columns in unique_keys(model):
+        await check_unique(session, batch, model, columns, errors)
+    return errors
+
+
+async def write_batch(session, batch, model, references, link, hooks):
+    errors = await check_batch(session, batch, model, references, link)
+    results = [{"index": i, "status": "error", "detail": detail} for i, detail in errors.items()]
+    valid = [(i, row) for i, row in batch if i not in errors]
+    inserts = [(i, row) for i, row in valid if row.id is None]
+    updates = [(i, row) for i, row in valid if row.id is not None]
+    exclude = {"id", link.field} if link else {"id"}
+    try:
+        states = [await hook.before(session, [row for _, row in valid]) for hook in hooks]
+        created = []
+        if inserts:
+            base = defaults(model)
+            statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+            values = [{**base, **row.model_dump(exclude=exclude)} for _, row in inserts]
+            created = (await session.exec(statement, params=values)).all()
+        values = [row.model_dump(exclude_unset=True, exclude={link.field} if link else None) for _, row in updates]
+        values = [v for v in values if len(v) > 1]
+        if values:
+            await session.exec(update(model), params=values)
+        if link:
+            await sync_batch_links(session, link, created, inserts, updates)
+        for hook, state in zip(hooks, states):
+            if hook.after is not None:
+                await hook.after(session, state)
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()
+        detail = str(getattr(e, "orig", e))
+        return results + [{"index": i, "status": "error", "detail": detail} for i, _ in valid]
+    results += [{"index": i, "status": "created", "id": new[0]} for (i, _), new in zip(inserts, created)]
+    results += [{"index": i, "status": "updated", "id": row.id} for i, row in updates]
+    return results
+
+
+async def sync_batch_links(session, link, created, inserts, updates):
+    pairs = [(new[0], getattr(row, link.field)) for (_, row), new in zip(inserts, created)]
+    pairs += [(row.id, getattr(row, link.field)) for _, row in updates]
+    targets = {own: set(others) for own, others in pairs if others is not None}
+    if not targets:
+        return
+    own_key = getattr(link.model, link.own_key)
+    other_key = getattr(link.model, link.other_key)
+    current = {own: set() for own in targets}
+    for own, other in (await session.exec(select(own_key, other_key).where(own_key.in_(targets)))).all():
+        current[own].add(other)
+    added = [(own, other) for own, others in targets.items() for other in others - current[own]]
+    removed = [(own, other) for own, others in current.items() for other in others - targets[own]]
+    if removed:
+        await session.exec(delete(link.model).where(tuple_(own_key, other_key).in_(removed)))
+    if added:
+        base = defaults(link.model)
+        values = [{**base, link.own_key: own, link.other_key: other} for own, other in added]
+        await session.exec(insert(link.model), params=values)
+
+
+async def bulk_upsert(session, rows, schema, model, references=None, link=None, hooks=()):
+    results, batch = [], []
+    index = 0
+    async for raw in rows:
+        try:
+            batch.append((index, validate(schema, raw)))
+        except ValidationError as e:
+            results.append({"index": index, "status": "error", "detail": str(e)})
+        index += 1
+        if len(batch) >= BULK_BATCH_SIZE:
+            results += await write_batch(session, batch, model, references or {}, link, hooks)
+            batch = []
+    if batch:
+        results += await write_batch(session, batch, model, references or {}, link, hooks)
+    return sorted(results, key=lambda result: result["index"])
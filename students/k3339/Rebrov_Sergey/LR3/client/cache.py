@@ -0,0 +1,145 @@
+import os
+import time
+import orjson
+from collections import OrderedDict, namedtuple
+from pydantic import TypeAdapter
+
+from metrics import observe_serialization
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "30"))
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+CacheEntry = namedtuple("CacheEntry", "body next_cursor")
+
+
+class NullCache:
+    async def get(self, key):
+        return None
+
+    async def set(self, key, entry, tags):
+        pass
+
+    async def invalidate(self, tags):
+        pass
+
+
+class MemoryCache:
+    def __init__(self, maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.tags = {}
+
+    def drop(self, key):
+        _, _, tags = self.entries.pop(key)
+        for name in tags:
+            keys = self.tags.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[name]
+
+    async def get(self, key):
+        item = self.entries.get(key)
+        if item is None:
+            return None
+        expires, entry, _ = item
+        if expires < time.monotonic():
+            self.drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    async def set(self, key, entry, tags):
+        if key in self.entries:
+            self.drop(key)
+        self.entries[key] = (time.monotonic() + self.ttl, entry, tags)
+        for name in tags:
+            self.tags.setdefault(name, set()).add(key)
+        while len(self.entries) > self.maxsize:
+            self.drop(next(iter(self.entries)))
+
+    async def invalidate(self, tags):
+        for name in tags:
+            for key in list(self.tags.get(name, ())):
+                self.drop(key)
+
+
+class RedisCache:
+    def __init__(self, url=REDIS_URL, ttl=CACHE_TTL):
+        from redis import asyncio as redis
+        self.redis = redis.from_url(url)
+        self.ttl = ttl
+
+    async def get(self, key):
+        item = await self.redis.hgetall(f"cache:{key}")
+        if not item:
+            return None
+        return CacheEntry(item[b"body"], item[b"cursor"].decode() or None)
+
+    async def set(self, key, entry, tags):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(f"cache:{key}", mapping={"body": entry.body, "cursor": entry.next_cursor or ""})
+            pipe.expire(f"cache:{key}", self.ttl)
+            for name in tags:
+                pipe.sadd(f"tag:{name}", f"cache:{key}")
+                pipe.expire(f"tag:{name}", self.ttl)
+            await pipe.execute()
+
+    async def invalidate(self, tags):
+        tags = [f"tag:{tag}" for tag in tags]
+        if not tags:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for name in tags:
+                pipe.smembers(name)
+            members = await pipe.execute()
+        await self.redis.delete(*tags, *set().union(*members))
+
+
+def make_cache():
+    if CACHE_BACKEND == "redis":
+        return RedisCache()
+    if CACHE_BACKEND == "memory":
+        return MemoryCache()
+    return NullCache()
+
+
+cache = make_cache()
+
+adapters = {}
+
+
+def render(schema, payload, include=None, sparse=False):
+    start = time.perf_counter()
+    adapter = adapters.get(schema)
+    if adapter is None:
+        adapter = adapters[schema] = TypeAdapter(schema)
+    body = adapter.dump_json(adapter.validate_python(payload), include=include, exclude_unset=sparse)
+    observe_serialization(schema, time.perf_counter() - start)
+    return body
+
+
+def render_rows(schema, names, rows):
+    start = time.perf_counter()
+    body = orjson.dumps([dict(zip(names, row)) for row in rows])
+    observe_serialization(schema, time.perf_counter() - start)
+    return body
+
+
+def tag(model, object_id):
+    return f"{model.__tablename__}:{object_id}"
+
+
+def entity_tags(model, obj):
+    tags = {f"{model.__tablename__}:*"}
+    if getattr(obj, "id", None) is not None:
+        tags.add(tag(model, obj.id))
+    for column in model.__table__.columns:
+        for foreign_key in column.foreign_keys:
+            value = getattr(obj, column.name, None)
+            if value is not None:
+                tags.add(f"{foreign_key.column.table.name}:{value}")
+    return tags
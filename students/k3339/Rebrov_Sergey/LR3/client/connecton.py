@@ -1,16 +1,221 @@
 import os
+import time
 from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 load_dotenv()
+
+
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
 db_url = os.getenv("DB_ADMIN")
-engine = create_engine(db_url, echo=True)
+db_async = env_flag("DB_ASYNC", "true")
+
+DB_ECHO = os.getenv("DB_ECHO", "false").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def observe(self, seconds):
+        self.checkouts += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+pool_metrics = PoolMetrics()
+
+
+def metered(pool_class):
+    class MeteredPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                pool_metrics.timeouts += 1
+                raise
+            finally:
+                pool_metrics.observe(time.perf_counter() - start)
+
+    MeteredPool.__name__ = f"Metered{pool_class.__name__}"
+    return MeteredPool
+
+
+def engine_options(url, is_async):
+    options = {"echo": {"true": True, "debug": "debug"}.get(DB_ECHO, False)}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=metered(AsyncAdaptedQueuePool if is_async else QueuePool),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if url.get_backend_name() == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def make_engine(url, is_async=False):
+    if is_async:
+        url = async_url(url)
+        return create_async_engine(url, **engine_options(url, True))
+    url = make_url(url)
+    return create_engine(url, **engine_options(url, False))
+
+
+engine = make_engine(db_url, db_async)
+sync_engine = getattr(engine, "sync_engine", engine)
+
+
+def dialect_insert(model):
+    if sync_engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def pool_stats():
+    pool = sync_engine.pool
+    stats = {
+        "checkouts": pool_metrics.checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "wait_seconds_total": round(pool_metrics.wait_seconds, 6),
+        "wait_seconds_max": round(pool_metrics.max_wait_seconds, 6),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return stats
+
+
+class BufferedResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def one(self):
+        if len(self.rows) != 1:
+            raise ValueError(f"Expected exactly one row, got {len(self.rows)}")
+        return self.rows[0]
+
+
+class ThreadedSession:
+    """Sync Session with the AsyncSession call signatures, run in the threadpool."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, instance):
+        self.session.add(instance)
+
+    def add_all(self, instances):
+        self.session.add_all(instances)
+
+    async def exec(self, statement, **kwargs):
+        def run():
+            result = self.session.exec(statement, **kwargs)
+            try:
+                return BufferedResult(result.all())
+            except exc.ResourceClosedError:
+                return result
+        return await run_in_threadpool(run)
+
+    async def execute(self, statement, **kwargs):
+        def run():
+            return BufferedResult(self.session.execute(statement, **kwargs).all())
+        return await run_in_threadpool(run)
+
+    async def get(self, model, ident, **kwargs):
+        return await run_in_threadpool(self.session.get, model, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.session.close)
+
+
+async def init_db():
+    if db_async:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    else:
+        await run_in_threadpool(SQLModel.metadata.create_all, engine)
 
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
+async def stream_rows(statement, batch_size):
+    statement = statement.execution_options(yield_per=batch_size)
+    if db_async:
+        async with AsyncSession(engine) as session:
+            result = await session.stream(statement)
+            async for rows in result.partitions():
+                yield rows
+    else:
+        with Session(engine) as session:
+            result = await run_in_threadpool(session.execute, statement)
+            partitions = result.partitions()
+            while rows := await run_in_threadpool(next, partitions, None):
+                yield rows
 
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+async def get_session():
+    if db_async:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    else:
+        session = ThreadedSession(Session(engine, expire_on_commit=False))
+        try:
+            yield session
+        finally:
+            await session.close()
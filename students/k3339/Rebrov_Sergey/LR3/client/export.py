@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+
+from connecton import stream_rows
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_statement(model):
+    return select(*model.__table__.columns).order_by(model.id)
+
+
+async def ndjson_chunks(statement, columns):
+    async for rows in stream_rows(statement, EXPORT_BATCH_SIZE):
+        yield "".join(
+            json.dumps(dict(zip(columns, map(plain, row))), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+async def csv_chunks(statement, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in stream_rows(statement, EXPORT_BATCH_SIZE):
+        writer.writerows([plain(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(statement, name, format):
+    columns = [column.name for column in statement.selected_columns]
+    chunks = csv_chunks if format == "csv" else ndjson_chunks
+    return StreamingResponse(
+        chunks(statement, columns),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
@@ -0,0 +1,144 @@
+from sqlalchemy import case, delete, func, tuple_, update
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+
+from connecton import dialect_insert
+from models import *
+
+KEY = ["challenge_id", "team_id"]
+STATS = [
+    "evaluation_count", "score_sum", "score_mean", "score_min", "score_max",
+    "latest_submission_id", "latest_submitted_at",
+]
+
+
+def group_of(submission):
+    return submission.challenge_id, submission.team_id
+
+
+async def affected_groups(session, evaluations):
+    submission_ids = {evaluation.submission_id for evaluation in evaluations}
+    updated = [evaluation.id for evaluation in evaluations if evaluation.id is not None]
+    if updated:
+        previous = await session.exec(select(Evaluation.submission_id).where(Evaluation.id.in_(updated)))
+        submission_ids |= set(previous.all())
+    if not submission_ids:
+        return set()
+    rows = await session.exec(
+        select(Submission.challenge_id, Submission.team_id).where(Submission.id.in_(submission_ids))
+    )
+    return {tuple(row) for row in rows.all()}
+
+
+async def add_score(session, submission, score):
+    entry = LeaderboardEntry
+    newer = entry.latest_submitted_at < submission.submitted_at
+    statement = dialect_insert(entry).values(
+        challenge_id=submission.challenge_id,
+        team_id=submission.team_id,
+        evaluation_count=1,
+        score_sum=score,
+        score_mean=score,
+        score_min=score,
+        score_max=score,
+        latest_submission_id=submission.id,
+        latest_submitted_at=submission.submitted_at,
+    ).on_conflict_do_update(index_elements=KEY, set_={
+        "evaluation_count": entry.evaluation_count + 1,
+        "score_sum": entry.score_sum + score,
+        "score_mean": (entry.score_sum + score) / (entry.evaluation_count + 1),
+        "score_min": case((entry.score_min <= score, entry.score_min), else_=score),
+        "score_max": case((entry.score_max >= score, entry.score_max), else_=score),
+        "latest_submission_id": case((newer, submission.id), else_=entry.latest_submission_id),
+        "latest_submitted_at": case((newer, submission.submitted_at), else_=entry.latest_submitted_at),
+    })
+    await session.exec(statement)
+
+
+async def change_score(session, submission, old, new):
+    if old == new:
+        return
+    table = LeaderboardEntry
+    result = await session.exec(
+        update(table)
+        .where(table.challenge_id == submission.challenge_id)
+        .where(table.team_id == submission.team_id)
+        .where(table.score_min != old)
+        .where(table.score_max != old)
+        .values(
+            score_sum=table.score_sum + (new - old),
+            score_mean=(table.score_sum + (new - old)) / table.evaluation_count,
+            score_min=case((table.score_min <= new, table.score_min), else_=new),
+            score_max=case((table.score_max >= new, table.score_max), else_=new),
+        )
+    )
+    if result.rowcount == 0:
+        await refresh(session, {group_of(submission)})
+
+
+async def refresh(session, groups):
+    groups = list(groups)
+    if not groups:
+        return
+    group = tuple_(Submission.challenge_id, Submission.team_id)
+    latest = aliased(Submission)
+    latest_evaluation = aliased(Evaluation)
+    latest_id = (
+        select(latest.id)
+        .join(latest_evaluation, latest_evaluation.submission_id == latest.id)
+        .where(latest.challenge_id == Submission.challenge_id, latest.team_id == Submission.team_id)
+        .order_by(latest.submitted_at.desc(), latest.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    aggregates = (
+        select(
+            Submission.challenge_id,
+            Submission.team_id,
+            func.count(Evaluation.id),
+            func.sum(Evaluation.score),
+            func.avg(Evaluation.score),
+            func.min(Evaluation.score),
+            func.max(Evaluation.score),
+            latest_id,
+            func.max(Submission.submitted_at),
+        )
+        .join(Evaluation, Evaluation.submission_id == Submission.id)
+        .where(group.in_(groups))
+        .group_by(Submission.challenge_id, Submission.team_id)
+    )
+    table = LeaderboardEntry
+    await session.exec(delete(table).where(tuple_(table.challenge_id, table.team_id).in_(groups)))
+    statement = dialect_insert(table).from_select(KEY + STATS, aggregates)
+    statement = statement.on_conflict_do_update(
+        index_elements=KEY,
+        set_={name: getattr(statement.excluded, name) for name in STATS},
+    )
+    await session.exec(statement)
+
+
+async def top(session, challenge_id, limit):
+    entries = (await session.exec(
+        select(LeaderboardEntry)
+        .where(LeaderboardEntry.challenge_id == challenge_id)
+        .order_by(LeaderboardEntry.score_mean.desc(), LeaderboardEntry.team_id)
+        .limit(limit)
+    )).all()
+    rows = []
+    for position, entry in enumerate(entries, start=1):
+        tied = rows and rows[-1]["score_mean"] == entry.score_mean
+        rows.append({**entry.model_dump(), "rank": rows[-1]["rank"] if tied else position})
+    return rows
+
+
+async def rank_of(session, challenge_id, team_id):
+    entry = await session.get(LeaderboardEntry, (challenge_id, team_id))
+    if entry is None:
+        return None
+    ahead = (await session.exec(
+        select(func.count())
+        .select_from(LeaderboardEntry)
+        .where(LeaderboardEntry.challenge_id == challenge_id)
+        .where(LeaderboardEntry.score_mean > entry.score_mean)
+    )).one()
+    return {**entry.model_dump(), "rank": ahead + 1}
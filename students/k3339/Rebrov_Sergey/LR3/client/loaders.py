@@ -0,0 +1,100 @@
+import os
+from collections import namedtuple
+from fastapi import HTTPException
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import select
+
+from models import *
+
+MAX_DEPTH = int(os.getenv("MAX_NESTING_DEPTH", "2"))
+
+PARTICIPANT_PLAN = {"evaluations": {}}
+TEAM_PLAN = {"participants": {"evaluations": {}}}
+CHALLENGE_PLAN = {"submissions": {"evaluations": {}}}
+SUBMISSION_PLAN = {"team": {"participants": {}}, "challenge": {}, "evaluations": {"judge": {}}}
+EVALUATION_PLAN = {"submission": {"team": {}, "challenge": {}}, "judge": {}}
+
+ViewQuery = namedtuple("ViewQuery", "fields expand")
+View = namedtuple("View", "plan include sparse")
+
+
+def limit_depth(plan, depth=MAX_DEPTH):
+    if depth <= 0:
+        return {}
+    return {name: limit_depth(sub, depth - 1) for name, sub in plan.items()}
+
+
+def view_query(fields: Optional[str] = None, expand: Optional[str] = None):
+    return ViewQuery(fields, expand)
+
+
+def split(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def expand_plan(plan, expand):
+    if expand is None:
+        return plan
+    allowed = limit_depth(plan)
+    chosen = {}
+    for path in split(expand):
+        node, options = chosen, allowed
+        for name in path.split("."):
+            if name not in options:
+                raise HTTPException(status_code=400, detail=f"Cannot expand {path}")
+            node, options = node.setdefault(name, {}), options[name]
+    return chosen
+
+
+def resolve_view(schema, plan, query):
+    chosen = expand_plan(plan, query.expand)
+    if query.fields is None:
+        return View(chosen, None, query.expand is not None)
+    names = set(split(query.fields))
+    unknown = names - (set(schema.model_fields) - set(plan))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {sorted(unknown)}")
+    return View(chosen, names | {"id"} | set(chosen), True)
+
+
+def flat_columns(model, schema, fields=None):
+    columns = model.__table__.columns
+    return [
+        columns[name] for name in schema.model_fields
+        if name in columns and (fields is None or name in fields)
+    ]
+
+
+def plan_options(model, plan):
+    options = []
+    for name, sub in limit_depth(plan).items():
+        attr = getattr(model, name)
+        relationship = attr.property
+        loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+        nested = plan_options(relationship.mapper.class_, sub)
+        options.append(loader.options(*nested) if nested else loader)
+    return options
+
+
+def serialize(obj, plan, tags=None):
+    if obj is None:
+        return None
+    if tags is not None:
+        tags.add(f"{obj.__tablename__}:{obj.id}")
+    data = obj.model_dump()
+    for name, sub in limit_depth(plan).items():
+        value = getattr(obj, name)
+        if isinstance(value, list):
+            data[name] = [serialize(item, sub, tags) for item in value]
+        else:
+            data[name] = serialize(value, sub, tags)
+    return data
+
+
+async def fetch(session, model, object_id, plan):
+    statement = select(model).where(model.id == object_id).options(*plan_options(model, plan))
+    return (await session.exec(statement.execution_options(populate_existing=True))).first()
+
+
+async def read(session, model, object_id, plan, tags=None):
+    return serialize(await fetch(session, model, object_id, plan), plan, tags)
@@ -1,354 +1,826 @@
+import asyncio
 import os
 import aiohttp
-from fastapi import FastAPI, Depends, HTTPException
-from sqlmodel import select, Session
+import orjson
+from typing import get_args
+from urllib.parse import quote, urlencode
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
 from fastapi.middleware.cors import CORSMiddleware
 
-from connecton import init_db, get_session
+from bulk import Hook, Link, bulk_upsert, existing_ids, read_rows
+from cache import CacheEntry, cache, entity_tags, render, render_rows, tag
+from export import export_response, export_statement
+from connecton import init_db, get_session, pool_stats, sync_engine, AsyncSession
+from leaderboard import add_score, affected_groups, change_score, group_of, rank_of, refresh, top
+from loaders import *
+from metrics import install_metrics, instrument_engine
+from parser_client import CircuitOpen, parser_client
+from membership import add_links, linked_ids, remove_links, sync_links
+from stats import (
+    add_evaluation, affected_stats, change_evaluation, refresh_stats, remove_evaluation, score_fields, stats_payload
+)
+from versions import bump, item_etag, list_etag, not_modified
 from models import *
 
 app = FastAPI()
 
-PARSER_URL = os.getenv("PARSER_URL")
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+MAX_BATCH_IDS = int(os.getenv("MAX_BATCH_IDS", "500"))
 
 
 @app.on_event("startup")
-def on_startup():
-    init_db()
+async def on_startup():
+    await init_db()
+    await parser_client.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await parser_client.close()
+
+
+def page_statement(statement, model, cursor, limit):
+    if cursor is not None:
+        statement = statement.where(model.id > cursor)
+    return statement.order_by(model.id).limit(limit + 1)
+
+
+def split_page(rows, limit):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, str(rows[-1].id)
+    return rows, None
+
+
+async def paginate(session, statement, model, plan, cursor, limit, tags=None):
+    statement = page_statement(statement.options(*plan_options(model, plan)), model, cursor, limit)
+    rows, next_cursor = split_page((await session.exec(statement)).all(), limit)
+    return [serialize(row, plan, tags) for row in rows], next_cursor
+
+
+async def paginate_flat(session, statement, model, schema, fields, cursor, limit, tags):
+    columns = flat_columns(model, get_args(schema)[0], fields)
+    statement = page_statement(statement.with_only_columns(*columns), model, cursor, limit)
+    rows, next_cursor = split_page((await session.execute(statement)).all(), limit)
+    tags.update(tag(model, row.id) for row in rows)
+    return render_rows(schema, [column.name for column in columns], rows), next_cursor
+
+
+def json_response(entry, etag):
+    headers = {"ETag": etag}
+    if entry.next_cursor:
+        headers["X-Next-Cursor"] = entry.next_cursor
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+PARTICIPANT_TEAMS = Link("team_ids", ParticipantTeamLink, "participant_id", "team_id", Team)
+TEAM_PARTICIPANTS = Link("participant_ids", ParticipantTeamLink, "team_id", "participant_id", Participant)
+
+
+def request_query(request):
+    return urlencode(sorted(request.query_params.multi_items()))
+
+
+async def cached_list(request, session, statement, model, plan, schema, cursor, limit, view):
+    plan, fields, sparse = resolve_view(get_args(schema)[0], plan, view)
+    query = request_query(request)
+    etag = await list_etag(session, model, plan, query)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    key = f"{model.__tablename__}:list:{query}:{etag}"
+    entry = await cache.get(key)
+    if entry is None:
+        tags = {f"{model.__tablename__}:*"}
+        if plan:
+            payload, next_cursor = await paginate(session, statement, model, plan, cursor, limit, tags)
+            body = render(schema, payload, fields and {"__all__": fields}, sparse)
+        else:
+            body, next_cursor = await paginate_flat(session, statement, model, schema, fields, cursor, limit, tags)
+        entry = CacheEntry(body, next_cursor)
+        await cache.set(key, entry, tags)
+    return json_response(entry, etag)
+
+
+async def cached_get(request, session, model, object_id, plan, schema, view):
+    plan, include, sparse = resolve_view(schema, plan, view)
+    etag = await item_etag(session, model, object_id, plan, request_query(request))
+    if etag is None:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    key = f"{tag(model, object_id)}:{etag}"
+    entry = await cache.get(key)
+    if entry is None:
+        tags = set()
+        payload = await read(session, model, object_id, plan, tags)
+        if payload is None:
+            raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+        entry = CacheEntry(render(schema, payload, include, sparse), None)
+        await cache.set(key, entry, tags)
+    return json_response(entry, etag)
+
+
+async def score_stats(session, table, model, object_id):
+    stats = await session.get(table, object_id)
+    if stats is None and not await session.get(model, object_id):
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    return stats_payload(stats)
+
+
+async def flush_or_conflict(session, detail):
+    try:
+        await session.flush()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail=detail)
+
+
+def tags_hook(model, tags, link=None):
+    async def collect(session, rows):
+        for row in rows:
+            tags.update(entity_tags(model, row))
+            if link:
+                tags.update(tag(link.target, i) for i in getattr(row, link.field) or [])
+    return Hook(collect, None)
 
 
 @app.get("/participants", response_model=List[ParticipantRead])
-def list_participants(session: Session = Depends(get_session)):
-    return session.exec(select(Participant)).all()
+async def list_participants(
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    team_id: Optional[int] = None,
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
+):
+    statement = select(Participant)
+    if team_id is not None:
+        statement = statement.join(ParticipantTeamLink).where(ParticipantTeamLink.team_id == team_id)
+    return await cached_list(
+        request, session, statement, Participant, PARTICIPANT_PLAN, List[ParticipantRead], cursor, limit, view
+    )
 
 
 @app.post("/participants", response_model=ParticipantRead)
-def create_participant(
+async def create_participant(
     data: ParticipantCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     participant = Participant(**data.model_dump(exclude_unset=True, exclude={"team_ids"}))
     if data.team_ids:
-        teams = session.exec(select(Team).where(Team.id.in_(data.team_ids))).all()
+        teams = (await session.exec(select(Team).where(Team.id.in_(data.team_ids)))).all()
         participant.teams = teams
     session.add(participant)
-    session.commit()
-    session.refresh(participant)
-    return participant
+    await session.commit()
+    await bump(session, Participant, Team)
+    linked = {tag(Team, team_id) for team_id in data.team_ids or []}
+    await cache.invalidate(entity_tags(Participant, participant) | linked)
+    return await read(session, Participant, participant.id, PARTICIPANT_PLAN)
+
+
+@app.post("/participants/bulk", response_model=List[BulkResult])
+async def bulk_participants(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    link = PARTICIPANT_TEAMS
+    tags = set()
+    hooks = [tags_hook(Participant, tags, link)]
+    results = await bulk_upsert(session, read_rows(request), ParticipantBulk, Participant, link=link, hooks=hooks)
+    await bump(session, Participant, Team)
+    await cache.invalidate(tags)
+    return results
 
 
 @app.get("/participants/{participant_id}", response_model=ParticipantRead)
-def get_participant(
+async def get_participant(
+    request: Request,
     participant_id: int,
-    session: Session = Depends(get_session)
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
 ):
-    participant = session.get(Participant, participant_id)
-    if not participant:
-        raise HTTPException(status_code=404, detail="Participant not found")
-    return participant
+    return await cached_get(request, session, Participant, participant_id, PARTICIPANT_PLAN, ParticipantRead, view)
 
 
 @app.patch("/participants/{participant_id}", response_model=ParticipantRead)
-def update_participant(
+async def update_participant(
     participant_id: int,
     data: ParticipantCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    participant = session.get(Participant, participant_id)
+    participant = await session.get(Participant, participant_id)
     if not participant:
         raise HTTPException(status_code=404, detail="Participant not found")
     updates = data.model_dump(exclude_unset=True, exclude={"team_ids"})
     for k, v in updates.items():
         setattr(participant, k, v)
+    changed = set()
     if data.team_ids is not None:
-        teams = session.exec(select(Team).where(Team.id.in_(data.team_ids))).all()
-        participant.teams = teams
+        changed = await sync_links(session, PARTICIPANT_TEAMS, participant.id, data.team_ids)
     session.add(participant)
-    session.commit()
-    session.refresh(participant)
-    return participant
+    await session.commit()
+    await bump(session, Participant, Team)
+    linked = {tag(Team, team_id) for team_id in changed}
+    await cache.invalidate(entity_tags(Participant, participant) | linked)
+    return await read(session, Participant, participant.id, PARTICIPANT_PLAN)
+
+
+@app.get("/participants/{participant_id}/stats", response_model=ScoreStatsRead)
+async def get_participant_stats(
+    participant_id: int,
+    session: AsyncSession = Depends(get_session)
+):
+    return await score_stats(session, JudgeStats, Participant, participant_id)
 
 
 @app.delete("/participants/{participant_id}")
-def delete_participant(
+async def delete_participant(
     participant_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    participant = session.get(Participant, participant_id)
+    participant = await session.get(Participant, participant_id)
     if not participant:
         raise HTTPException(status_code=404, detail="Participant not found")
-    session.delete(participant)
-    session.commit()
+    await session.delete(participant)
+    await session.commit()
+    await bump(session, Participant, Team)
+    await cache.invalidate(entity_tags(Participant, participant))
     return {"ok": True}
 
 
 @app.get("/teams", response_model=List[TeamRead])
-def list_teams(session: Session = Depends(get_session)):
-    return session.exec(select(Team)).all()
+async def list_teams(
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    participant_id: Optional[int] = None,
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
+):
+    statement = select(Team)
+    if participant_id is not None:
+        statement = statement.join(ParticipantTeamLink).where(ParticipantTeamLink.participant_id == participant_id)
+    return await cached_list(
+        request, session, statement, Team, TEAM_PLAN, List[TeamRead], cursor, limit, view
+    )
 
 
 @app.post("/teams", response_model=TeamRead)
-def create_team(
+async def create_team(
     data: TeamCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     team = Team(**data.model_dump(exclude_unset=True, exclude={"participant_ids"}))
     if data.participant_ids:
-        participants = session.exec(select(Participant).where(Participant.id.in_(data.participant_ids))).all()
+        participants = (await session.exec(select(Participant).where(Participant.id.in_(data.participant_ids)))).all()
         team.participants = participants
     session.add(team)
-    session.commit()
-    session.refresh(team)
-    return team
+    await session.commit()
+    await bump(session, Participant, Team)
+    linked = {tag(Participant, participant_id) for participant_id in data.participant_ids or []}
+    await cache.invalidate(entity_tags(Team, team) | linked)
+    return await read(session, Team, team.id, TEAM_PLAN)
+
+
+@app.post("/teams/bulk", response_model=List[BulkResult])
+async def bulk_teams(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    link = TEAM_PARTICIPANTS
+    tags = set()
+    hooks = [tags_hook(Team, tags, link)]
+    results = await bulk_upsert(session, read_rows(request), TeamBulk, Team, link=link, hooks=hooks)
+    await bump(session, Participant, Team)
+    await cache.invalidate(tags)
+    return results
 
 
 @app.get("/teams/{team_id}", response_model=TeamRead)
-def get_team(
+async def get_team(
+    request: Request,
     team_id: int,
-    session: Session = Depends(get_session)
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
 ):
-    team = session.get(Team, team_id)
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-    return team
+    return await cached_get(request, session, Team, team_id, TEAM_PLAN, TeamRead, view)
 
 
 @app.patch("/teams/{team_id}", response_model=TeamRead)
-def update_team(
+async def update_team(
     team_id: int,
     data: TeamCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    team = session.get(Team, team_id)
+    team = await session.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     updates = data.model_dump(exclude_unset=True, exclude={"participant_ids"})
     for k, v in updates.items():
         setattr(team, k, v)
+    changed = set()
     if data.participant_ids is not None:
-        participants = session.exec(select(Participant).where(Participant.id.in_(data.participant_ids))).all()
-        team.participants = participants
+        changed = await sync_links(session, TEAM_PARTICIPANTS, team.id, data.participant_ids)
     session.add(team)
-    session.commit()
-    session.refresh(team)
-    return team
+    await session.commit()
+    await bump(session, Participant, Team)
+    linked = {tag(Participant, participant_id) for participant_id in changed}
+    await cache.invalidate(entity_tags(Team, team) | linked)
+    return await read(session, Team, team.id, TEAM_PLAN)
+
+
+async def change_membership(session, team_id, participant_ids, apply):
+    team = await session.get(Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    changed = await apply(set(participant_ids))
+    if changed:
+        await session.commit()
+        await bump(session, Participant, Team)
+        await cache.invalidate(entity_tags(Team, team) | {tag(Participant, i) for i in changed})
+    return await read(session, Team, team.id, TEAM_PLAN)
+
+
+@app.post("/teams/{team_id}/participants", response_model=TeamRead)
+async def add_team_participants(
+    team_id: int,
+    data: TeamMembership,
+    session: AsyncSession = Depends(get_session)
+):
+    async def apply(ids):
+        missing = ids - await existing_ids(session, Participant, ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Participant not found: {sorted(missing)}")
+        added = ids - await linked_ids(session, TEAM_PARTICIPANTS, team_id)
+        await add_links(session, TEAM_PARTICIPANTS, team_id, added)
+        return added
+    return await change_membership(session, team_id, data.participant_ids, apply)
+
+
+@app.delete("/teams/{team_id}/participants", response_model=TeamRead)
+async def remove_team_participants(
+    team_id: int,
+    participant_ids: List[int] = Query(),
+    session: AsyncSession = Depends(get_session)
+):
+    async def apply(ids):
+        removed = ids & await linked_ids(session, TEAM_PARTICIPANTS, team_id)
+        await remove_links(session, TEAM_PARTICIPANTS, team_id, removed)
+        return removed
+    return await change_membership(session, team_id, participant_ids, apply)
 
 
 @app.delete("/teams/{team_id}")
-def delete_team(
+async def delete_team(
     team_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    team = session.get(Team, team_id)
+    team = await session.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
-    session.delete(team)
-    session.commit()
+    await session.delete(team)
+    await session.commit()
+    await bump(session, Participant, Team)
+    await cache.invalidate(entity_tags(Team, team))
     return {"ok": True}
 
 
 @app.get("/challenges", response_model=List[ChallengeRead])
-def list_challenges(session: Session = Depends(get_session)):
-    return session.exec(select(Challenge)).all()
+async def list_challenges(
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
+):
+    statement = select(Challenge)
+    return await cached_list(
+        request, session, statement, Challenge, CHALLENGE_PLAN, List[ChallengeRead], cursor, limit, view
+    )
 
 
 @app.post("/challenges", response_model=ChallengeRead)
-def create_challenge(
+async def create_challenge(
     data: ChallengeCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     challenge = Challenge(**data.model_dump(exclude_unset=True))
     session.add(challenge)
-    session.commit()
-    session.refresh(challenge)
-    return challenge
+    await session.commit()
+    await bump(session, Challenge)
+    await cache.invalidate(entity_tags(Challenge, challenge))
+    return await read(session, Challenge, challenge.id, CHALLENGE_PLAN)
 
 
 @app.get("/challenges/{challenge_id}", response_model=ChallengeRead)
-def get_challenge(
+async def get_challenge(
+    request: Request,
     challenge_id: int,
-    session: Session = Depends(get_session)
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
 ):
-    challenge = session.get(Challenge, challenge_id)
-    if not challenge:
+    return await cached_get(request, session, Challenge, challenge_id, CHALLENGE_PLAN, ChallengeRead, view)
+
+
+@app.get("/challenges/{challenge_id}/leaderboard", response_model=LeaderboardRead)
+async def get_leaderboard(
+    challenge_id: int,
+    limit: int = Query(default=10, ge=1, le=MAX_PAGE_SIZE),
+    team_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    if not await session.get(Challenge, challenge_id):
         raise HTTPException(status_code=404, detail="Challenge not found")
-    return challenge
+    leaderboard = {"challenge_id": challenge_id, "entries": await top(session, challenge_id, limit)}
+    if team_id is not None:
+        leaderboard["team"] = await rank_of(session, challenge_id, team_id)
+    return leaderboard
 
 
 @app.patch("/challenges/{challenge_id}", response_model=ChallengeRead)
-def update_challenge(
+async def update_challenge(
     challenge_id: int,
     data: ChallengeCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    challenge = session.get(Challenge, challenge_id)
+    challenge = await session.get(Challenge, challenge_id)
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     updates = data.model_dump(exclude_unset=True)
     for k, v in updates.items():
         setattr(challenge, k, v)
     session.add(challenge)
-    session.commit()
-    session.refresh(challenge)
-    return challenge
+    await session.commit()
+    await bump(session, Challenge)
+    await cache.invalidate(entity_tags(Challenge, challenge))
+    return await read(session, Challenge, challenge.id, CHALLENGE_PLAN)
 
 
 @app.delete("/challenges/{challenge_id}")
-def delete_challenge(
+async def delete_challenge(
     challenge_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    challenge = session.get(Challenge, challenge_id)
+    challenge = await session.get(Challenge, challenge_id)
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
-    session.delete(challenge)
-    session.commit()
+    await session.delete(challenge)
+    await session.commit()
+    await bump(session, Challenge)
+    await cache.invalidate(entity_tags(Challenge, challenge))
     return {"ok": True}
 
 
 @app.get("/submissions", response_model=List[SubmissionRead])
-def list_submissions(session: Session = Depends(get_session)):
-    return session.exec(select(Submission)).all()
+async def list_submissions(
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    team_id: Optional[int] = None,
+    challenge_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
+):
+    statement = select(Submission)
+    if team_id is not None:
+        statement = statement.where(Submission.team_id == team_id)
+    if challenge_id is not None:
+        statement = statement.where(Submission.challenge_id == challenge_id)
+    if submitted_from is not None:
+        statement = statement.where(Submission.submitted_at >= submitted_from)
+    if submitted_to is not None:
+        statement = statement.where(Submission.submitted_at < submitted_to)
+    return await cached_list(
+        request, session, statement, Submission, SUBMISSION_PLAN, List[SubmissionRead], cursor, limit, view
+    )
 
 
 @app.post("/submissions", response_model=SubmissionRead)
-def create_submission(
+async def create_submission(
     data: SubmissionCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     submission = Submission(**data.model_dump(exclude_unset=True))
     session.add(submission)
-    session.commit()
-    session.refresh(submission)
-    return submission
+    await session.commit()
+    await bump(session, Submission)
+    await cache.invalidate(entity_tags(Submission, submission))
+    return await read(session, Submission, submission.id, SUBMISSION_PLAN)
 
 
 @app.get("/submissions/{submission_id}", response_model=SubmissionRead)
-def get_submission(
+async def get_submission(
+    request: Request,
     submission_id: int,
-    session: Session = Depends(get_session)
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
 ):
-    submission = session.get(Submission, submission_id)
-    if not submission:
-        raise HTTPException(status_code=404, detail="Submission not found")
-    return submission
+    return await cached_get(request, session, Submission, submission_id, SUBMISSION_PLAN, SubmissionRead, view)
+
+
+@app.get("/submissions/{submission_id}/stats", response_model=ScoreStatsRead)
+async def get_submission_stats(
+    submission_id: int,
+    session: AsyncSession = Depends(get_session)
+):
+    return await score_stats(session, SubmissionStats, Submission, submission_id)
 
 
 @app.patch("/submissions/{submission_id}", response_model=SubmissionRead)
-def update_submission(
+async def update_submission(
     submission_id: int,
     data: SubmissionCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    submission = session.get(Submission, submission_id)
+    submission = await session.get(Submission, submission_id)
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
+    previous = group_of(submission)
     updates = data.model_dump(exclude_unset=True)
     for k, v in updates.items():
         setattr(submission, k, v)
     session.add(submission)
-    session.commit()
-    session.refresh(submission)
-    return submission
+    await session.flush()
+    if group_of(submission) != previous:
+        await refresh(session, {previous, group_of(submission)})
+    await session.commit()
+    await bump(session, Submission)
+    await cache.invalidate(entity_tags(Submission, submission))
+    return await read(session, Submission, submission.id, SUBMISSION_PLAN)
 
 
 @app.delete("/submissions/{submission_id}")
-def delete_submission(
+async def delete_submission(
     submission_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    submission = session.get(Submission, submission_id)
+    submission = await session.get(Submission, submission_id)
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
-    session.delete(submission)
-    session.commit()
+    await session.delete(submission)
+    await session.flush()
+    await refresh(session, {group_of(submission)})
+    await session.commit()
+    await bump(session, Submission)
+    await cache.invalidate(entity_tags(Submission, submission))
     return {"ok": True}
 
 
 @app.get("/evaluations", response_model=List[EvaluationRead])
-def list_evaluations(session: Session = Depends(get_session)):
-    return session.exec(select(Evaluation)).all()
+async def list_evaluations(
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    submission_id: Optional[int] = None,
+    judge_id: Optional[int] = None,
+    evaluated_from: Optional[datetime] = None,
+    evaluated_to: Optional[datetime] = None,
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
+):
+    statement = select(Evaluation)
+    if submission_id is not None:
+        statement = statement.where(Evaluation.submission_id == submission_id)
+    if judge_id is not None:
+        statement = statement.where(Evaluation.judge_id == judge_id)
+    if evaluated_from is not None:
+        statement = statement.where(Evaluation.evaluated_at >= evaluated_from)
+    if evaluated_to is not None:
+        statement = statement.where(Evaluation.evaluated_at < evaluated_to)
+    return await cached_list(
+        request, session, statement, Evaluation, EVALUATION_PLAN, List[EvaluationRead], cursor, limit, view
+    )
 
 
 @app.post("/evaluations", response_model=EvaluationRead)
-def create_evaluation(
+async def create_evaluation(
     data: EvaluationCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
+    submission = await session.get(Submission, data.submission_id)
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
     evaluation = Evaluation(**data.model_dump(exclude_unset=True))
     session.add(evaluation)
-    session.commit()
-    session.refresh(evaluation)
-    return evaluation
+    await flush_or_conflict(session, "Judge has already evaluated this submission")
+    await add_score(session, submission, evaluation.score)
+    await add_evaluation(session, score_fields(evaluation))
+    await session.commit()
+    await bump(session, Evaluation)
+    await cache.invalidate(entity_tags(Evaluation, evaluation))
+    return await read(session, Evaluation, evaluation.id, EVALUATION_PLAN)
+
+
+@app.post("/evaluations/bulk", response_model=List[BulkResult])
+async def bulk_evaluations(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    references = {"submission_id": Submission, "judge_id": Participant}
+    tags = set()
+    hooks = [
+        Hook(affected_groups, refresh),
+        Hook(affected_stats, refresh_stats),
+        tags_hook(Evaluation, tags),
+    ]
+    results = await bulk_upsert(
+        session, read_rows(request), EvaluationBulk, Evaluation, references=references, hooks=hooks
+    )
+    await bump(session, Evaluation)
+    await cache.invalidate(tags)
+    return results
 
 
 @app.get("/evaluations/{evaluation_id}", response_model=EvaluationRead)
-def get_evaluation(
+async def get_evaluation(
+    request: Request,
     evaluation_id: int,
-    session: Session = Depends(get_session)
+    view: ViewQuery = Depends(view_query),
+    session: AsyncSession = Depends(get_session)
 ):
-    evaluation = session.get(Evaluation, evaluation_id)
-    if not evaluation:
-        raise HTTPException(status_code=404, detail="Evaluation not found")
-    return evaluation
+    return await cached_get(request, session, Evaluation, evaluation_id, EVALUATION_PLAN, EvaluationRead, view)
 
 
 @app.patch("/evaluations/{evaluation_id}", response_model=EvaluationRead)
-def update_evaluation(
+async def update_evaluation(
     evaluation_id: int,
     data: EvaluationCreateOrUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    evaluation = session.get(Evaluation, evaluation_id)
+    evaluation = await session.get(Evaluation, evaluation_id)
     if not evaluation:
         raise HTTPException(status_code=404, detail="Evaluation not found")
+    previous = await session.get(Submission, evaluation.submission_id)
+    old_score = evaluation.score
+    old_fields = score_fields(evaluation)
     updates = data.model_dump(exclude_unset=True)
+    submission = await session.get(Submission, updates.get("submission_id", evaluation.submission_id))
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
     for k, v in updates.items():
         setattr(evaluation, k, v)
     session.add(evaluation)
-    session.commit()
-    session.refresh(evaluation)
-    return evaluation
+    await flush_or_conflict(session, "Judge has already evaluated this submission")
+    if submission is previous:
+        await change_score(session, submission, old_score, evaluation.score)
+    else:
+        await refresh(session, {group_of(previous), group_of(submission)})
+    await change_evaluation(session, old_fields, score_fields(evaluation))
+    await session.commit()
+    await bump(session, Evaluation)
+    await cache.invalidate(entity_tags(Evaluation, evaluation))
+    return await read(session, Evaluation, evaluation.id, EVALUATION_PLAN)
 
 
 @app.delete("/evaluations/{evaluation_id}")
-def delete_evaluation(
+async def delete_evaluation(
     evaluation_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    evaluation = session.get(Evaluation, evaluation_id)
+    evaluation = await session.get(Evaluation, evaluation_id)
     if not evaluation:
         raise HTTPException(status_code=404, detail="Evaluation not found")
-    session.delete(evaluation)
-    session.commit()
+    submission = await session.get(Submission, evaluation.submission_id)
+    await session.delete(evaluation)
+    await session.flush()
+    await refresh(session, {group_of(submission)})
+    await remove_evaluation(session, score_fields(evaluation))
+    await session.commit()
+    await bump(session, Evaluation)
+    await cache.invalidate(entity_tags(Evaluation, evaluation))
     return {"ok": True}
 
 
+BATCH_RESOURCES = {
+    "participants": (Participant, PARTICIPANT_PLAN, ParticipantRead),
+    "teams": (Team, TEAM_PLAN, TeamRead),
+    "challenges": (Challenge, CHALLENGE_PLAN, ChallengeRead),
+    "submissions": (Submission, SUBMISSION_PLAN, SubmissionRead),
+    "evaluations": (Evaluation, EVALUATION_PLAN, EvaluationRead),
+}
+
+
+async def batch_items(session, model, plan, schema, item):
+    if len(item.ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} ids per resource")
+    plan, fields, sparse = resolve_view(schema, plan, ViewQuery(item.fields, item.expand))
+    statement = select(model).where(model.id.in_(set(item.ids))).options(*plan_options(model, plan))
+    found = {
+        row.id: render(schema, serialize(row, plan), fields, sparse)
+        for row in (await session.exec(statement)).all()
+    }
+    items = (found.get(i) or orjson.dumps({"id": i, "error": "not found"}) for i in item.ids)
+    return b"[" + b",".join(items) + b"]"
+
+
+@app.post("/batch/get")
+async def batch_get(
+    data: BatchGetRequest,
+    session: AsyncSession = Depends(get_session)
+):
+    parts = []
+    for name, (model, plan, schema) in BATCH_RESOURCES.items():
+        item = getattr(data, name)
+        if item is not None:
+            parts.append(orjson.dumps(name) + b":" + await batch_items(session, model, plan, schema, item))
+    return Response(b"{" + b",".join(parts) + b"}", media_type="application/json")
+
+
+@app.get("/export/submissions")
+async def export_submissions(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    challenge_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None
+):
+    statement = export_statement(Submission)
+    if challenge_id is not None:
+        statement = statement.where(Submission.challenge_id == challenge_id)
+    if team_id is not None:
+        statement = statement.where(Submission.team_id == team_id)
+    if submitted_from is not None:
+        statement = statement.where(Submission.submitted_at >= submitted_from)
+    if submitted_to is not None:
+        statement = statement.where(Submission.submitted_at < submitted_to)
+    return export_response(statement, "submissions", format)
+
+
+@app.get("/export/evaluations")
+async def export_evaluations(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    challenge_id: Optional[int] = None,
+    judge_id: Optional[int] = None,
+    evaluated_from: Optional[datetime] = None,
+    evaluated_to: Optional[datetime] = None
+):
+    statement = export_statement(Evaluation)
+    if challenge_id is not None:
+        statement = statement.join(Submission).where(Submission.challenge_id == challenge_id)
+    if judge_id is not None:
+        statement = statement.where(Evaluation.judge_id == judge_id)
+    if evaluated_from is not None:
+        statement = statement.where(Evaluation.evaluated_at >= evaluated_from)
+    if evaluated_to is not None:
+        statement = statement.where(Evaluation.evaluated_at < evaluated_to)
+    return export_response(statement, "evaluations", format)
+
+
+async def call_parser(method, path, error, route=None, **kwargs):
+    try:
+        status, body = await parser_client.request(method, path, route, **kwargs)
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=f"Parser unavailable: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise HTTPException(status_code=500, detail=f"{error} request failed: {str(e) or type(e).__name__}")
+    if status != 200:
+        raise HTTPException(status_code=status, detail=f"{error} error: {body}")
+    return orjson.loads(body)
+
+
 @app.post("/parse")
 async def parse_endpoint(url: str):
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(f"{PARSER_URL}/parse?url={url}") as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise HTTPException(status_code=resp.status, detail=f"Parser error: {text}")
-                return {"message": "Parser completed"}
-        except aiohttp.ClientError as e:
-            raise HTTPException(status_code=500, detail=f"Parser request failed: {str(e)}")
+    await call_parser("POST", "/parse", "Parser", params={"url": url})
+    return {"message": "Parser completed"}
 
 
 @app.post("/parse_celery")
-async def parse_endpoint(url: str):
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(f"{PARSER_URL}/parse_celery?url={url}") as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise HTTPException(status_code=resp.status, detail=f"Task error: {text}")
-                return {"message": "Task started"}
-        except aiohttp.ClientError as e:
-            raise HTTPException(status_code=500, detail=f"Task request failed: {str(e)}")
+async def parse_celery_endpoint(url: str):
+    return await call_parser("POST", "/parse_celery", "Task", params={"url": url})
+
+
+@app.post("/parse/batch")
+async def parse_batch_endpoint(request: Request, chunk_size: Optional[int] = Query(None, ge=1, le=1000)):
+    params = {"chunk_size": chunk_size} if chunk_size else {}
+    headers = {"Content-Type": request.headers.get("content-type", "application/json")}
+    body = await request.body()
+    return await call_parser("POST", "/parse/batch", "Task", data=body, headers=headers, params=params)
+
+
+@app.get("/tasks/groups/{group_id}")
+async def get_task_group(group_id: str):
+    path = f"/tasks/groups/{quote(group_id, safe='')}"
+    return await call_parser("GET", path, "Task", route="/tasks/groups/{group_id}")
+
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    path = f"/tasks/{quote(task_id, safe='')}"
+    return await call_parser("GET", path, "Task", route="/tasks/{task_id}")
+
+
+@app.get("/db/pool")
+async def db_pool():
+    return pool_stats()
+
 
+instrument_engine(sync_engine)
+install_metrics(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,36 @@
+from sqlalchemy import delete
+from sqlmodel import select
+
+from bulk import defaults, existing_ids
+from connecton import dialect_insert
+
+
+async def linked_ids(session, link, own_id):
+    own_key = getattr(link.model, link.own_key)
+    other_key = getattr(link.model, link.other_key)
+    return set((await session.exec(select(other_key).where(own_key == own_id))).all())
+
+
+async def add_links(session, link, own_id, ids):
+    if not ids:
+        return
+    base = defaults(link.model)
+    values = [{**base, link.own_key: own_id, link.other_key: other} for other in ids]
+    await session.exec(dialect_insert(link.model).values(values).on_conflict_do_nothing())
+
+
+async def remove_links(session, link, own_id, ids):
+    if not ids:
+        return
+    own_key = getattr(link.model, link.own_key)
+    other_key = getattr(link.model, link.other_key)
+    await session.exec(delete(link.model).where(own_key == own_id).where(other_key.in_(ids)))
+
+
+async def sync_links(session, link, own_id, ids):
+    current = await linked_ids(session, link, own_id)
+    target = await existing_ids(session, link.target, ids)
+    added, removed = target - current, current - target
+    await add_links(session, link, own_id, added)
+    await remove_links(session, link, own_id, removed)
+    return added | removed
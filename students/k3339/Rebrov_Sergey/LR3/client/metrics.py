@@ -0,0 +1,99 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import get_args
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from sqlalchemy import event
+
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency", ["method", "route", "status"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"], buckets=SIZE_BUCKETS
+)
+DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements per request", ["method", "route"], buckets=COUNT_BUCKETS
+)
+DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request", ["method", "route"]
+)
+SERIALIZATION_TIME = Histogram(
+    "serialization_seconds", "Time spent validating and dumping response models", ["schema"]
+)
+
+
+class RequestStats:
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+current_stats = ContextVar("current_stats", default=None)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += time.perf_counter() - conn.info["query_start"]
+
+
+def schema_name(schema):
+    args = get_args(schema)
+    return f"List[{args[0].__name__}]" if args else schema.__name__
+
+
+def observe_serialization(schema, seconds):
+    SERIALIZATION_TIME.labels(schema_name(schema)).observe(seconds)
+    stats = current_stats.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+def server_timing(stats, elapsed):
+    return ", ".join([
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements"',
+        f"serialize;dur={stats.serialize_seconds * 1000:.2f}",
+        f"total;dur={elapsed * 1000:.2f}",
+    ])
+
+
+def install_metrics(app):
+    @app.middleware("http")
+    async def measure(request, call_next):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            current_stats.reset(token)
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        route = route.path if route else "unmatched"
+        REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(elapsed)
+        DB_STATEMENTS.labels(request.method, route).observe(stats.statements)
+        DB_TIME.labels(request.method, route).observe(stats.db_seconds)
+        size = response.headers.get("content-length")
+        if size is not None:
+            RESPONSE_SIZE.labels(request.method, route).observe(int(size))
+        if METRICS_SERVER_TIMING:
+            response.headers["Server-Timing"] = server_timing(stats, elapsed)
+        return response
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -17,6 +17,10 @@ from models import (
     Challenge,
     Submission,
     Evaluation,
+    LeaderboardEntry,
+    ResourceVersion,
+    JudgeStats,
+    SubmissionStats,
 )
 
 env_path = Path(__file__).resolve().parents[3] / '.env'
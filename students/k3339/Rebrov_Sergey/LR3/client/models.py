@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -8,7 +9,7 @@ class ParticipantTeamLink(SQLModel, table=True):
         default=None, foreign_key="participant.id", primary_key=True
     )
     team_id: Optional[int] = Field(
-        default=None, foreign_key="team.id", primary_key=True
+        default=None, foreign_key="team.id", primary_key=True, index=True
     )
     joined_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -21,6 +22,10 @@ class ParticipantDefault(SQLModel):
 
 class Participant(ParticipantDefault, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
     teams: List["Team"] = Relationship(
         back_populates="participants",
         link_model=ParticipantTeamLink
@@ -39,12 +44,20 @@ class ParticipantCreateOrUpdate(ParticipantDefault):
     team_ids: Optional[List[int]] = None
 
 
+class ParticipantBulk(ParticipantCreateOrUpdate):
+    id: Optional[int] = None
+
+
 class TeamDefault(SQLModel):
     name: str
 
 
 class Team(TeamDefault, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
     participants: List[Participant] = Relationship(
         back_populates="teams",
         link_model=ParticipantTeamLink
@@ -63,6 +76,14 @@ class TeamCreateOrUpdate(TeamDefault):
     participant_ids: Optional[List[int]] = None
 
 
+class TeamMembership(SQLModel):
+    participant_ids: List[int]
+
+
+class TeamBulk(TeamCreateOrUpdate):
+    id: Optional[int] = None
+
+
 class ChallengeDefault(SQLModel):
     title: str
     description: Optional[str] = None
@@ -71,6 +92,10 @@ class ChallengeDefault(SQLModel):
 
 class Challenge(ChallengeDefault, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
     submissions: List["Submission"] = Relationship(
         back_populates="challenge"
     )
@@ -86,14 +111,19 @@ class ChallengeCreateOrUpdate(ChallengeDefault):
 
 
 class SubmissionDefault(SQLModel):
-    team_id: int = Field(foreign_key="team.id")
+    team_id: int = Field(foreign_key="team.id", index=True)
     challenge_id: int = Field(foreign_key="challenge.id")
     file_url: str
 
 
 class Submission(SubmissionDefault, table=True):
+    __table_args__ = (Index("ix_submission_group", "challenge_id", "team_id", "submitted_at"),)
     id: Optional[int] = Field(default=None, primary_key=True)
-    submitted_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
+    submitted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     team: "Team" = Relationship(back_populates="submissions")
     challenge: "Challenge" = Relationship(back_populates="submissions")
     evaluations: List["Evaluation"] = Relationship(
@@ -115,14 +145,19 @@ class SubmissionCreateOrUpdate(SubmissionDefault):
 
 class EvaluationDefault(SQLModel):
     submission_id: int = Field(foreign_key="submission.id")
-    judge_id: int = Field(foreign_key="participant.id")
+    judge_id: int = Field(foreign_key="participant.id", index=True)
     score: float
     comments: Optional[str] = None
 
 
 class Evaluation(EvaluationDefault, table=True):
+    __table_args__ = (Index("ux_evaluation_submission_judge", "submission_id", "judge_id", unique=True),)
     id: Optional[int] = Field(default=None, primary_key=True)
-    evaluated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
+    evaluated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     submission: "Submission" = Relationship(back_populates="evaluations")
     judge: "Participant" = Relationship(back_populates="evaluations")
 
@@ -136,3 +171,87 @@ class EvaluationRead(EvaluationDefault):
 
 class EvaluationCreateOrUpdate(EvaluationDefault):
     pass
+
+
+class EvaluationBulk(EvaluationCreateOrUpdate):
+    id: Optional[int] = None
+
+
+class LeaderboardEntry(SQLModel, table=True):
+    __table_args__ = (Index("ix_leaderboardentry_rank", "challenge_id", "score_mean"),)
+
+    challenge_id: int = Field(foreign_key="challenge.id", primary_key=True)
+    team_id: int = Field(foreign_key="team.id", primary_key=True)
+    evaluation_count: int = 0
+    score_sum: float = 0
+    score_mean: Optional[float] = None
+    score_min: Optional[float] = None
+    score_max: Optional[float] = None
+    latest_submission_id: Optional[int] = None
+    latest_submitted_at: Optional[datetime] = None
+
+
+class LeaderboardRow(SQLModel):
+    rank: int
+    team_id: int
+    evaluation_count: int
+    score_sum: float
+    score_mean: Optional[float] = None
+    score_min: Optional[float] = None
+    score_max: Optional[float] = None
+    latest_submission_id: Optional[int] = None
+    latest_submitted_at: Optional[datetime] = None
+
+
+class LeaderboardRead(SQLModel):
+    challenge_id: int
+    entries: List[LeaderboardRow]
+    team: Optional[LeaderboardRow] = None
+
+
+class ScoreStatsDefault(SQLModel):
+    evaluation_count: int = 0
+    score_sum: float = 0
+    score_mean: float = 0
+    score_m2: float = 0
+
+
+class JudgeStats(ScoreStatsDefault, table=True):
+    judge_id: int = Field(foreign_key="participant.id", primary_key=True)
+
+
+class SubmissionStats(ScoreStatsDefault, table=True):
+    submission_id: int = Field(foreign_key="submission.id", primary_key=True)
+
+
+class ScoreStatsRead(SQLModel):
+    evaluation_count: int
+    score_sum: float
+    score_mean: Optional[float] = None
+    score_variance: Optional[float] = None
+
+
+class ResourceVersion(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+    version: int = 0
+
+
+class BatchGetItem(SQLModel):
+    ids: List[int]
+    fields: Optional[str] = None
+    expand: Optional[str] = None
+
+
+class BatchGetRequest(SQLModel):
+    participants: Optional[BatchGetItem] = None
+    teams: Optional[BatchGetItem] = None
+    challenges: Optional[BatchGetItem] = None
+    submissions: Optional[BatchGetItem] = None
+    evaluations: Optional[BatchGetItem] = None
+
+
+class BulkResult(SQLModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
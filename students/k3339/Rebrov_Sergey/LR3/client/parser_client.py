@@ -0,0 +1,129 @@
+import asyncio
+import os
+import random
+import time
+import aiohttp
+from prometheus_client import Counter, Gauge, Histogram
+
+PARSER_URL = os.getenv("PARSER_URL")
+PARSER_TIMEOUT = float(os.getenv("PARSER_TIMEOUT", "60"))
+PARSER_CONNECT_TIMEOUT = float(os.getenv("PARSER_CONNECT_TIMEOUT", "3"))
+PARSER_MAX_CONNECTIONS = int(os.getenv("PARSER_MAX_CONNECTIONS", "50"))
+PARSER_RETRIES = int(os.getenv("PARSER_RETRIES", "2"))
+PARSER_BACKOFF = float(os.getenv("PARSER_BACKOFF", "0.2"))
+BREAKER_FAILURES = int(os.getenv("PARSER_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("PARSER_BREAKER_RESET", "30"))
+
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+PARSER_LATENCY = Histogram(
+    "parser_request_duration_seconds", "Latency of requests to the parser service", ["route", "status"]
+)
+PARSER_RETRIES_TOTAL = Counter("parser_request_retries_total", "Retried requests to the parser service", ["route"])
+BREAKER_STATE = Gauge("parser_breaker_state", "Parser circuit breaker state (0 closed, 1 half-open, 2 open)")
+BREAKER_OPENED = Counter("parser_breaker_opened_total", "Times the parser circuit breaker opened")
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    STATES = {"closed": 0, "half-open": 1, "open": 2}
+
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.max_failures = failures
+        self.reset = reset
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        BREAKER_STATE.set_function(lambda: self.STATES[self.state])
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def abandon(self):
+        self.trial = False
+
+    def failure(self):
+        self.failures += 1
+        if self.trial or self.failures >= self.max_failures:
+            if self.opened_at is None or self.trial:
+                BREAKER_OPENED.inc()
+            self.opened_at = time.monotonic()
+            self.trial = False
+
+
+class ParserClient:
+    def __init__(self, base_url=PARSER_URL):
+        self.base_url = base_url
+        self.session = None
+        self.breaker = CircuitBreaker()
+
+    async def start(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=PARSER_MAX_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=PARSER_TIMEOUT, connect=PARSER_CONNECT_TIMEOUT),
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, method, path, route=None, **kwargs):
+        route = route or path
+        if not self.breaker.allow():
+            raise CircuitOpen(f"Parser circuit is open after {self.breaker.failures} failures")
+        await self.start()
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        try:
+            for attempt in range(PARSER_RETRIES + 1):
+                last = attempt == PARSER_RETRIES
+                start = time.perf_counter()
+                try:
+                    async with self.session.request(method, f"{self.base_url}{path}", **kwargs) as response:
+                        body = await response.text()
+                        PARSER_LATENCY.labels(route, response.status).observe(time.perf_counter() - start)
+                        if response.status not in RETRY_STATUSES:
+                            self.breaker.success()
+                            return response.status, body
+                        if last or not idempotent:
+                            self.breaker.failure()
+                            return response.status, body
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    PARSER_LATENCY.labels(route, "error").observe(time.perf_counter() - start)
+                    if last or not (idempotent or isinstance(e, aiohttp.ClientConnectorError)):
+                        raise
+                PARSER_RETRIES_TOTAL.labels(route).inc()
+                await asyncio.sleep(PARSER_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except BaseException:
+            self.breaker.failure()
+            raise
+
+
+parser_client = ParserClient()
@@ -0,0 +1,121 @@
+from sqlalchemy import case, delete, func, update
+from sqlmodel import select
+
+from connecton import dialect_insert
+from models import *
+
+TABLES = [(JudgeStats, "judge_id"), (SubmissionStats, "submission_id")]
+
+
+def score_fields(evaluation):
+    return {"submission_id": evaluation.submission_id, "judge_id": evaluation.judge_id, "score": evaluation.score}
+
+
+async def add_value(session, table, key, value, score):
+    delta = score - table.score_mean
+    mean = table.score_mean + delta / (table.evaluation_count + 1)
+    statement = dialect_insert(table).values({
+        key: value, "evaluation_count": 1, "score_sum": score, "score_mean": score, "score_m2": 0,
+    })
+    await session.exec(statement.on_conflict_do_update(index_elements=[key], set_={
+        "evaluation_count": table.evaluation_count + 1,
+        "score_sum": table.score_sum + score,
+        "score_mean": mean,
+        "score_m2": table.score_m2 + delta * (score - mean),
+    }))
+
+
+async def remove_value(session, table, key, value, score):
+    column = getattr(table, key)
+    rest = table.evaluation_count - 1
+    mean = (table.score_sum - score) / rest
+    await session.exec(update(table).where(column == value).values(
+        evaluation_count=rest,
+        score_sum=table.score_sum - score,
+        score_mean=case((rest == 0, 0.0), else_=mean),
+        score_m2=case((rest == 0, 0.0), else_=table.score_m2 - (score - table.score_mean) * (score - mean)),
+    ))
+    await session.exec(delete(table).where(column == value).where(table.evaluation_count == 0))
+
+
+async def replace_value(session, table, key, value, old, new):
+    if old == new:
+        return
+    mean = table.score_mean + (new - old) / table.evaluation_count
+    await session.exec(update(table).where(getattr(table, key) == value).values(
+        score_sum=table.score_sum + (new - old),
+        score_mean=mean,
+        score_m2=table.score_m2 + (new - old) * (new - mean + old - table.score_mean),
+    ))
+
+
+async def add_evaluation(session, values):
+    for table, key in TABLES:
+        await add_value(session, table, key, values[key], values["score"])
+
+
+async def remove_evaluation(session, values):
+    for table, key in TABLES:
+        await remove_value(session, table, key, values[key], values["score"])
+
+
+async def change_evaluation(session, old, new):
+    for table, key in TABLES:
+        if old[key] == new[key]:
+            await replace_value(session, table, key, new[key], old["score"], new["score"])
+        else:
+            await remove_value(session, table, key, old[key], old["score"])
+            await add_value(session, table, key, new[key], new["score"])
+
+
+async def affected_stats(session, evaluations):
+    keys = {key: {getattr(evaluation, key) for evaluation in evaluations} for _, key in TABLES}
+    updated = [evaluation.id for evaluation in evaluations if evaluation.id is not None]
+    if updated:
+        previous = await session.exec(
+            select(Evaluation.judge_id, Evaluation.submission_id).where(Evaluation.id.in_(updated))
+        )
+        for judge_id, submission_id in previous.all():
+            keys["judge_id"].add(judge_id)
+            keys["submission_id"].add(submission_id)
+    return keys
+
+
+async def refresh_stats(session, keys):
+    for table, key in TABLES:
+        ids = list(keys.get(key, ()))
+        if not ids:
+            continue
+        column = getattr(Evaluation, key)
+        means = (
+            select(column.label("key"), func.avg(Evaluation.score).label("mean"))
+            .where(column.in_(ids))
+            .group_by(column)
+            .subquery()
+        )
+        deviation = Evaluation.score - means.c.mean
+        aggregates = (
+            select(column, func.count(Evaluation.id), func.sum(Evaluation.score), means.c.mean,
+                   func.sum(deviation * deviation))
+            .join(means, means.c.key == column)
+            .group_by(column, means.c.mean)
+        )
+        names = [key, "evaluation_count", "score_sum", "score_mean", "score_m2"]
+        await session.exec(delete(table).where(getattr(table, key).in_(ids)))
+        statement = dialect_insert(table).from_select(names, aggregates)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={name: getattr(statement.excluded, name) for name in names[1:]},
+        )
+        await session.exec(statement)
+
+
+def stats_payload(stats):
+    if stats is None or not stats.evaluation_count:
+        return {"evaluation_count": 0, "score_sum": 0, "score_mean": None, "score_variance": None}
+    return {
+        "evaluation_count": stats.evaluation_count,
+        "score_sum": stats.score_sum,
+        "score_mean": stats.score_mean,
+        "score_variance": max(stats.score_m2, 0) / stats.evaluation_count,
+    }
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+
+os.environ["DB_ADMIN"] = f"sqlite:///{DB_PATH}"
+os.environ["DB_ASYNC"] = "true"
+os.environ["CACHE_BACKEND"] = "none"
+os.environ.setdefault("PARSER_URL", "http://parser.test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from test_query_counts import seed
+
+
+def test_duplicate_evaluation_fails_only_its_row():
+    seed(3)
+    rows = [
+        {"submission_id": 1, "judge_id": 1, "score": 1},
+        {"submission_id": 1, "judge_id": 3, "score": 2},
+        {"submission_id": 2, "judge_id": 3, "score": 2},
+        {"submission_id": 2, "judge_id": 3, "score": 4},
+        {"id": 1, "submission_id": 1, "judge_id": 1, "score": 9},
+        {"id": 2, "submission_id": 1, "judge_id": 1, "score": 9},
+    ]
+    with TestClient(app) as client:
+        results = client.post("/evaluations/bulk", json=rows).json()
+    assert [result["status"] for result in results] == ["error", "created", "created", "error", "updated", "error"]
+    assert "already exists" in results[0]["detail"]
+    assert "in batch" in results[3]["detail"]
@@ -0,0 +1,99 @@
+import asyncio
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from parser_client import PARSER_RETRIES, ParserClient
+
+
+async def slow(request):
+    await asyncio.sleep(10)
+    return web.json_response({})
+
+
+async def undecodable(request):
+    return web.Response(body=b"\xff\xfe\xfa", content_type="application/json", charset="utf-8")
+
+
+async def ok(request):
+    return web.json_response({"ok": True})
+
+
+async def half_open_client(server):
+    client = ParserClient(str(server.make_url("")).rstrip("/"))
+    client.breaker.opened_at = 0
+    assert client.breaker.state == "half-open"
+    return client
+
+
+def run_trial(trial):
+    async def main():
+        app = web.Application()
+        app.router.add_get("/slow", slow)
+        app.router.add_get("/undecodable", undecodable)
+        app.router.add_get("/ok", ok)
+        async with TestServer(app) as server:
+            client = await half_open_client(server)
+            try:
+                await trial(client)
+                state = client.breaker.state
+                if state == "open":
+                    client.breaker.opened_at = 0
+                return state, await client.request("GET", "/ok")
+            finally:
+                await client.close()
+    return asyncio.run(main())
+
+
+def test_cancelled_trial_lets_next_request_probe():
+    async def trial(client):
+        task = asyncio.create_task(client.request("GET", "/slow"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    state, (status, _) = run_trial(trial)
+    assert state == "half-open"
+    assert status == 200
+
+
+def test_failed_trial_reopens_breaker():
+    async def trial(client):
+        with pytest.raises(UnicodeDecodeError):
+            await client.request("GET", "/undecodable")
+
+    state, (status, _) = run_trial(trial)
+    assert state == "open"
+    assert status == 200
+
+
+def count_attempts(method):
+    hits = []
+
+    async def handler(request):
+        hits.append(request.method)
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async def main():
+        app = web.Application()
+        app.router.add_route(method, "/parse", handler)
+        async with TestServer(app) as server:
+            client = ParserClient(str(server.make_url("")).rstrip("/"))
+            try:
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.request(method, "/parse", timeout=aiohttp.ClientTimeout(total=0.1))
+            finally:
+                await client.close()
+    asyncio.run(main())
+    return len(hits)
+
+
+def test_post_timeout_is_not_resent():
+    assert count_attempts("POST") == 1
+
+
+def test_get_timeout_is_retried():
+    assert count_attempts("GET") == PARSER_RETRIES + 1
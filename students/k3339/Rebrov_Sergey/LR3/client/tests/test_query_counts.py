@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event
+from sqlmodel import Session, SQLModel, create_engine
+
+from conftest import DB_PATH
+from connecton import sync_engine
+from main import app
+from models import *
+
+MAX_STATEMENTS = {
+    "/participants": 3,
+    "/participants/{id}": 4,
+    "/teams": 4,
+    "/teams/{id}": 5,
+    "/challenges": 4,
+    "/challenges/{id}": 5,
+    "/submissions": 4,
+    "/submissions/{id}": 5,
+    "/evaluations": 2,
+    "/evaluations/{id}": 3,
+}
+
+seed_engine = create_engine(f"sqlite:///{DB_PATH}")
+
+
+def seed(size):
+    SQLModel.metadata.create_all(seed_engine)
+    with Session(seed_engine) as session:
+        for model in (Evaluation, Submission, ParticipantTeamLink, Participant, Team, Challenge, ResourceVersion):
+            session.exec(delete(model))
+        participants = [Participant(name=f"p{i}", email=f"p{i}@example.com") for i in range(size)]
+        teams = [Team(name=f"t{i}", participants=participants) for i in range(size)]
+        challenges = [Challenge(title=f"c{i}") for i in range(size)]
+        session.add_all(participants + teams + challenges)
+        session.flush()
+        submissions = [
+            Submission(team_id=team.id, challenge_id=challenge.id, file_url="https://example.com/file")
+            for team in teams for challenge in challenges
+        ]
+        session.add_all(submissions)
+        session.flush()
+        session.add_all(
+            Evaluation(submission_id=submission.id, judge_id=judge.id, score=i)
+            for submission in submissions for i, judge in enumerate(participants[:2])
+        )
+        session.commit()
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def statements():
+    counter = {"count": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(sync_engine, "before_cursor_execute", count)
+    yield counter
+    event.remove(sync_engine, "before_cursor_execute", count)
+
+
+def count_statements(client, statements, path):
+    statements["count"] = 0
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    return statements["count"]
+
+
+@pytest.mark.parametrize("route", MAX_STATEMENTS)
+def test_statements_per_request_stay_flat(client, statements, route):
+    counts = []
+    for size in (2, 6):
+        seed(size)
+        counts.append(count_statements(client, statements, route.replace("{id}", "1")))
+    assert counts[0] == counts[1]
+    assert counts[1] <= MAX_STATEMENTS[route]
@@ -0,0 +1,60 @@
+import hashlib
+from sqlmodel import select
+
+from connecton import dialect_insert
+from loaders import limit_depth
+from models import *
+
+
+def plan_tables(model, plan):
+    tables = {model.__tablename__}
+    for name, sub in limit_depth(plan).items():
+        target = getattr(model, name).property.mapper.class_
+        tables |= plan_tables(target, sub)
+    return tables
+
+
+async def bump(session, *models):
+    values = [{"name": name, "version": 1} for name in sorted({model.__tablename__ for model in models})]
+    statement = dialect_insert(ResourceVersion).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": ResourceVersion.version + 1},
+    )
+    await session.exec(statement)
+    await session.commit()
+
+
+async def current_versions(session, tables):
+    rows = await session.exec(
+        select(ResourceVersion.name, ResourceVersion.version).where(ResourceVersion.name.in_(tables))
+    )
+    versions = dict(rows.all())
+    return [(name, versions.get(name, 0)) for name in sorted(tables)]
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+async def item_etag(session, model, object_id, plan, query=""):
+    updated_at = (await session.exec(select(model.updated_at).where(model.id == object_id))).first()
+    if updated_at is None:
+        return None
+    embedded = plan_tables(model, plan) - {model.__tablename__}
+    versions = await current_versions(session, embedded) if embedded else []
+    return make_etag(model.__tablename__, object_id, updated_at.isoformat(), versions, plan, query)
+
+
+async def list_etag(session, model, plan, query):
+    versions = await current_versions(session, plan_tables(model, plan))
+    return make_etag(model.__tablename__, query, versions, plan)
+
+
+def not_modified(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
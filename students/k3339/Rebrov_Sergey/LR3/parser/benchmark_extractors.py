@@ -0,0 +1,67 @@
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from head import BACKENDS, HEAD_CHUNK_SIZE, HeadExtractor, sniff_encoding, soup_extract
+
+BENCH_FIXTURES = os.getenv("BENCH_FIXTURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+BENCH_BACKENDS = os.getenv("BENCH_BACKENDS", ",".join(BACKENDS)).split(",")
+REPEATS = int(os.getenv("BENCH_REPEATS", "50"))
+
+
+def load_fixtures():
+    fixtures = []
+    for name in sorted(os.listdir(BENCH_FIXTURES)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(BENCH_FIXTURES, name), "rb") as file:
+                fixtures.append((name, file.read()))
+    return fixtures
+
+
+def extract(data, backend):
+    extractor = HeadExtractor("text/html", backend=backend)
+    for start in range(0, len(data), HEAD_CHUNK_SIZE):
+        if extractor.feed(data[start:start + HEAD_CHUNK_SIZE]):
+            break
+    return extractor.result()
+
+
+def run_backend(backend, fixtures):
+    results = {name: extract(data, backend) for name, data in fixtures}
+    latencies = []
+    for _ in range(REPEATS):
+        for _, data in fixtures:
+            start = time.perf_counter()
+            extract(data, backend)
+            latencies.append(time.perf_counter() - start)
+    return results, latencies, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+if __name__ == "__main__":
+    fixtures = load_fixtures()
+    expected = {name: soup_extract(data, sniff_encoding(None, data)) for name, data in fixtures}
+    print(f"Страниц: {len(fixtures)}, повторов: {REPEATS}")
+
+    for backend in BENCH_BACKENDS:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                results, latencies, rss = pool.submit(run_backend, backend, fixtures).result()
+            except ImportError as e:
+                print(f"{backend:<12} не установлен: {e}")
+                continue
+        latencies.sort()
+        mismatches = [name for name in expected if results[name] != expected[name]]
+        print(
+            f"{backend:<12} {len(latencies) / sum(latencies):10.0f} стр/сек"
+            f"  p50: {percentile(latencies, 0.5) * 1000:8.3f} мс"
+            f"  p99: {percentile(latencies, 0.99) * 1000:8.3f} мс"
+            f"  пик RSS: {rss:7.1f} МБ"
+            f"  расхождений: {len(mismatches)}"
+        )
+        for name in mismatches:
+            print(f"    {name}: {results[name]} != {expected[name]}")
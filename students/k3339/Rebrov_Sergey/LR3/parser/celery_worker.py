@@ -1,12 +1,16 @@
+import os
 from celery import Celery
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
 celery_app = Celery(
     "worker",
-    broker="redis://redis:6379/0",
-    backend="redis://redis:6379/0",
+    broker=REDIS_URL,
+    backend=REDIS_URL,
     include=["tasks"],
 )
 
 celery_app.conf.task_routes = {
     "tasks.parse_and_save_task": {"queue": "parser"},
+    "tasks.parse_chunk_task": {"queue": "parser"},
 }
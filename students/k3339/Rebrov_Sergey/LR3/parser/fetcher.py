@@ -0,0 +1,106 @@
+import asyncio
+import os
+import aiohttp
+from celery.signals import worker_process_shutdown
+from celery.utils.log import get_task_logger
+
+FETCH_MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", "100"))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "8"))
+FETCH_CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", "5"))
+FETCH_READ_TIMEOUT = float(os.getenv("FETCH_READ_TIMEOUT", "20"))
+FETCH_TOTAL_TIMEOUT = float(os.getenv("FETCH_TOTAL_TIMEOUT", "60"))
+
+logger = get_task_logger(__name__)
+
+
+class ConnectionStats:
+    def __init__(self):
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+
+    def reuse_rate(self):
+        total = self.created + self.reused
+        return self.reused / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_rate": round(self.reuse_rate(), 4),
+        }
+
+
+class Fetcher:
+    def __init__(self):
+        self.loop = None
+        self.session = None
+        self.session_loop = None
+        self.stats = ConnectionStats()
+
+    def trace_config(self):
+        async def on_request_start(session, context, params):
+            self.stats.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.stats.created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.stats.reused += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    async def client(self):
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.session_loop is not loop:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=FETCH_MAX_CONNECTIONS, limit_per_host=FETCH_PER_HOST),
+                timeout=aiohttp.ClientTimeout(
+                    total=FETCH_TOTAL_TIMEOUT,
+                    sock_connect=FETCH_CONNECT_TIMEOUT,
+                    sock_read=FETCH_READ_TIMEOUT,
+                ),
+                trace_configs=[self.trace_config()],
+            )
+            self.session_loop = loop
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def run(self, coroutine):
+        if self.loop is None or self.loop.is_closed():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+        try:
+            return self.loop.run_until_complete(coroutine)
+        finally:
+            self.log_stats()
+
+    def shutdown(self):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.run_until_complete(self.close())
+            self.loop.close()
+        self.loop = None
+
+    def log_stats(self):
+        stats = self.stats
+        logger.info(
+            "aiohttp connections: %d requests, %d created, %d reused (reuse rate %.1f%%)",
+            stats.requests, stats.created, stats.reused, stats.reuse_rate() * 100,
+        )
+
+
+fetcher = Fetcher()
+
+
+@worker_process_shutdown.connect
+def close_fetcher(**kwargs):
+    fetcher.shutdown()
@@ -0,0 +1,263 @@
+import codecs
+import hashlib
+import os
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+
+HEAD_MAX_BYTES = int(os.getenv("HEAD_MAX_BYTES", "262144"))
+HEAD_CHUNK_SIZE = int(os.getenv("HEAD_CHUNK_SIZE", "16384"))
+HEAD_DRAIN_BYTES = int(os.getenv("HEAD_DRAIN_BYTES", "65536"))
+HEAD_BACKEND = os.getenv("HEAD_BACKEND", "stream")
+HEAD_SNIFF_BYTES = 1024
+
+CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+HEADER_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+HEAD_END_RE = re.compile(rb"</head\s*>|<body[\s>]", re.I)
+TITLE_RE = re.compile(rb"<title[\s>]", re.I)
+
+
+def lookup_encoding(name):
+    try:
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+
+
+def sniff_encoding(content_type, data):
+    if data.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    match = HEADER_CHARSET_RE.search(content_type or "")
+    if match and lookup_encoding(match.group(1)):
+        return lookup_encoding(match.group(1))
+    match = CHARSET_RE.search(data[:HEAD_SNIFF_BYTES])
+    if match and lookup_encoding(match.group(1).decode("ascii", "ignore")):
+        return lookup_encoding(match.group(1).decode("ascii", "ignore"))
+    return "utf-8"
+
+
+class HeadParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.title_parts = None
+        self.in_title = False
+        self.description = None
+        self.finished = False
+
+    @property
+    def title(self):
+        if self.title_parts is None:
+            return None
+        return "".join(self.title_parts).strip() or None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title" and self.title_parts is None:
+            self.title_parts = []
+            self.in_title = True
+        elif tag == "meta" and self.description is None:
+            attrs = dict(attrs)
+            if (attrs.get("name") or "").lower() == "description" and attrs.get("content"):
+                self.description = attrs["content"].strip()
+        elif tag == "body":
+            self.finished = True
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.in_title = False
+        elif tag == "head":
+            self.finished = True
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+
+
+def first_description(contents):
+    for content in contents:
+        if content and content.strip():
+            return content.strip()
+    return None
+
+
+def soup_extract(data, encoding):
+    soup = BeautifulSoup(data.decode(encoding, "replace"), "html.parser")
+    title = soup.title.get_text().strip() if soup.title else None
+    metas = soup.find_all("meta", attrs={"name": re.compile("^description$", re.I)})
+    return title or None, first_description(meta.get("content") for meta in metas)
+
+
+def lxml_extract(data, encoding):
+    import lxml.html
+    from lxml.etree import ParserError
+
+    text = data.decode(encoding, "replace").encode("utf-8")
+    try:
+        document = lxml.html.document_fromstring(text, parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except ParserError:
+        return None, None
+    title = document.find(".//title")
+    title = title.text_content().strip() if title is not None else None
+    metas = document.iter("meta")
+    return title or None, first_description(
+        meta.get("content") for meta in metas if (meta.get("name") or "").lower() == "description"
+    )
+
+
+def selectolax_extract(data, encoding):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(data.decode(encoding, "replace"))
+    title = tree.css_first("title")
+    title = title.text().strip() if title is not None else None
+    metas = tree.css("meta[name]")
+    return title or None, first_description(
+        meta.attributes.get("content") for meta in metas
+        if (meta.attributes.get("name") or "").lower() == "description"
+    )
+
+
+BACKENDS = {
+    "stream": soup_extract,
+    "html.parser": soup_extract,
+    "lxml": lxml_extract,
+    "selectolax": selectolax_extract,
+}
+
+
+class HeadExtractor:
+    def __init__(self, content_type=None, max_bytes=HEAD_MAX_BYTES, backend=None):
+        self.backend = backend or HEAD_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown head backend: {self.backend}")
+        self.content_type = content_type
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.raw = bytearray()
+        self.encoding = None
+        self.decoder = None
+        self.parser = HeadParser() if self.backend == "stream" else None
+        self.title_seen = False
+        self.full = False
+        self.done = False
+
+    def start(self):
+        self.encoding = sniff_encoding(self.content_type, bytes(self.raw[:HEAD_SNIFF_BYTES]))
+        if self.parser is not None:
+            self.decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+            self.parse(bytes(self.raw))
+
+    def parse(self, chunk, final=False):
+        if self.full:
+            return
+        self.parser.feed(self.decoder.decode(chunk, final))
+        if self.parser.finished:
+            if self.parser.title is None:
+                self.full = True
+            else:
+                self.done = True
+
+    def scan(self, start):
+        window = self.raw[max(start - 16, 0):]
+        self.title_seen = self.title_seen or TITLE_RE.search(window) is not None
+        if self.title_seen and HEAD_END_RE.search(window):
+            self.done = True
+
+    def feed(self, chunk):
+        if self.done:
+            return True
+        chunk = chunk[:self.max_bytes - self.received]
+        start = self.received
+        self.received += len(chunk)
+        self.raw += chunk
+        if self.parser is None:
+            self.scan(start)
+        elif self.decoder is None:
+            if len(self.raw) >= HEAD_SNIFF_BYTES or self.received >= self.max_bytes:
+                self.start()
+        else:
+            self.parse(chunk)
+        self.done = self.done or self.received >= self.max_bytes
+        return self.done
+
+    def digest(self):
+        match = HEAD_END_RE.search(self.raw)
+        if match and TITLE_RE.search(self.raw, 0, match.start()):
+            return hashlib.sha256(self.raw[:match.end()]).hexdigest()
+        return hashlib.sha256(self.raw).hexdigest()
+
+    def result(self):
+        if self.encoding is None:
+            self.start()
+        if self.parser is not None:
+            self.parse(b"", final=True)
+            if not self.full and self.parser.title is not None:
+                return self.parser.title, self.parser.description
+        return BACKENDS[self.backend](bytes(self.raw), self.encoding)
+
+
+def conditional_headers(known):
+    headers = {}
+    if known and known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known and known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    return headers
+
+
+def unchanged(known, digest):
+    return known is not None and known.get("content_hash") == digest
+
+
+def fetch_meta(headers, digest):
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "content_hash": digest,
+        "fetched_at": datetime.utcnow(),
+    }
+
+
+def revalidated(known, headers):
+    known = known or {}
+    return {
+        "etag": headers.get("ETag") or known.get("etag"),
+        "last_modified": headers.get("Last-Modified") or known.get("last_modified"),
+        "fetched_at": datetime.utcnow(),
+    }
+
+
+def should_drain(headers, received):
+    length = headers.get("Content-Length")
+    if length is None or not length.isdigit() or headers.get("Content-Encoding"):
+        return False
+    return int(length) - received <= HEAD_DRAIN_BYTES
+
+
+async def read_head(response, max_bytes=HEAD_MAX_BYTES):
+    extractor = HeadExtractor(response.headers.get("Content-Type"), max_bytes)
+    received = 0
+    async for chunk in response.content.iter_chunked(HEAD_CHUNK_SIZE):
+        received += len(chunk)
+        if extractor.feed(chunk):
+            break
+    if should_drain(response.headers, received):
+        await response.read()
+    return extractor
+
+
+def read_head_sync(response, max_bytes=HEAD_MAX_BYTES):
+    extractor = HeadExtractor(response.headers.get("Content-Type"), max_bytes)
+    received = 0
+    chunks = response.iter_content(HEAD_CHUNK_SIZE)
+    for chunk in chunks:
+        received += len(chunk)
+        if extractor.feed(chunk):
+            break
+    if should_drain(response.headers, received):
+        for _ in chunks:
+            pass
+    response.close()
+    return extractor
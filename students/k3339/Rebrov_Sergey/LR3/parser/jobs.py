@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import uuid
+import redis
+from celery.result import AsyncResult, GroupResult
+
+from celery_worker import REDIS_URL, celery_app
+
+PARSE_INFLIGHT_TTL = int(os.getenv("PARSE_INFLIGHT_TTL", "600"))
+
+redis_client = redis.Redis.from_url(REDIS_URL)
+
+
+def inflight_key(url):
+    return f"parse:inflight:{hashlib.sha1(url.encode()).hexdigest()}"
+
+
+def claim(urls, task_id):
+    keys = [inflight_key(url) for url in urls]
+    with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.set(key, task_id, nx=True, ex=PARSE_INFLIGHT_TTL)
+        acquired = pipe.execute()
+    claimed = [url for url, ok in zip(urls, acquired) if ok]
+    busy = [(url, key) for url, key, ok in zip(urls, keys, acquired) if not ok]
+    owners = redis_client.mget([key for _, key in busy]) if busy else []
+    running = {}
+    for (url, key), owner in zip(busy, owners):
+        if owner is None:
+            redis_client.set(key, task_id, ex=PARSE_INFLIGHT_TTL)
+            claimed.append(url)
+        else:
+            running[url] = owner.decode()
+    return claimed, running
+
+
+def submit(task, url):
+    task_id = str(uuid.uuid4())
+    claimed, running = claim([url], task_id)
+    if claimed:
+        try:
+            task.apply_async(args=[url], queue="parser", task_id=task_id)
+        except Exception:
+            release([url], task_id)
+            raise
+        return task_id, True
+    return running[url], False
+
+
+def release(urls, task_id):
+    keys = [inflight_key(url) for url in urls]
+    owners = redis_client.mget(keys)
+    owned = [key for key, owner in zip(keys, owners) if owner == task_id.encode()]
+    if owned:
+        redis_client.delete(*owned)
+
+
+def read_urls(body, content_type):
+    if content_type.startswith("application/json"):
+        urls = json.loads(body)
+        if not isinstance(urls, list):
+            raise ValueError("Expected a JSON list of URLs")
+    else:
+        urls = [json.loads(line) if line.startswith('"') else line for line in body.decode().splitlines()]
+    urls = [url.strip() for url in urls if isinstance(url, str)]
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def submit_chunks(task, urls, chunk_size):
+    chunks, running = [], {}
+    for start in range(0, len(urls), chunk_size):
+        task_id = str(uuid.uuid4())
+        claimed, busy = claim(urls[start:start + chunk_size], task_id)
+        running.update(busy)
+        if claimed:
+            try:
+                task.apply_async(args=[claimed], queue="parser", task_id=task_id)
+            except Exception:
+                release(claimed, task_id)
+                raise
+            chunks.append({"task_id": task_id, "urls": len(claimed)})
+    task_ids = [chunk["task_id"] for chunk in chunks] + list(dict.fromkeys(running.values()))
+    results = [AsyncResult(task_id, app=celery_app) for task_id in task_ids]
+    group = GroupResult(str(uuid.uuid4()), results, app=celery_app)
+    group.save()
+    return group.id, chunks, running
+
+
+def task_status(task_id):
+    result = AsyncResult(task_id, app=celery_app)
+    status = {"task_id": task_id, "state": result.state, "ready": result.ready()}
+    if result.successful():
+        status["result"] = result.result
+    elif result.failed():
+        status["error"] = repr(result.result)
+    return status
+
+
+def group_status(group_id):
+    group = GroupResult.restore(group_id, app=celery_app)
+    if group is None:
+        return None
+    states = [result.state for result in group.results]
+    return {
+        "group_id": group_id,
+        "total": len(states),
+        "completed": states.count("SUCCESS"),
+        "failed": states.count("FAILURE"),
+        "ready": all(result.ready() for result in group.results),
+        "tasks": [{"task_id": result.id, "state": state} for result, state in zip(group.results, states)],
+    }
@@ -1,10 +1,23 @@
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from tasks import parse_and_save_task, parse
+from connection import engine, pool_stats
+from fetcher import fetcher
+from jobs import group_status, read_urls, submit, submit_chunks, task_status
+from metrics import install_metrics, instrument_engine
+from tasks import parse_and_save_task, parse_chunk_task, parse
+
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", "50"))
 
 app = FastAPI()
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await fetcher.close()
+
+
 @app.post("/parse")
 async def parse_endpoint(url: str):
     await parse(url)
@@ -12,10 +25,51 @@ async def parse_endpoint(url: str):
 
 
 @app.post("/parse_celery")
-async def parse_endpoint(url: str):
-    parse_and_save_task.apply_async(args=[url], queue='parser')
-    return {"message": "Task started"}
+async def parse_celery_endpoint(url: str):
+    task_id, created = await run_in_threadpool(submit, parse_and_save_task, url)
+    return {"message": "Task started" if created else "Task already running", "task_id": task_id}
+
+
+@app.post("/parse/batch")
+async def parse_batch_endpoint(request: Request, chunk_size: int = Query(PARSE_CHUNK_SIZE, ge=1, le=1000)):
+    try:
+        urls = read_urls(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    group_id, chunks, running = await run_in_threadpool(submit_chunks, parse_chunk_task, urls, chunk_size)
+    return {
+        "group_id": group_id,
+        "urls": len(urls),
+        "chunks": chunks,
+        "running": [{"url": url, "task_id": task_id} for url, task_id in running.items()],
+    }
+
+
+@app.get("/tasks/groups/{group_id}")
+async def get_task_group(group_id: str):
+    status = await run_in_threadpool(group_status, group_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Task group not found")
+    return status
+
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    return await run_in_threadpool(task_status, task_id)
+
+
+@app.get("/db/pool")
+async def db_pool():
+    return pool_stats()
+
+
+@app.get("/fetch/connections")
+async def fetch_connections():
+    return fetcher.stats.as_dict()
+
 
+instrument_engine(engine)
+install_metrics(app)
 
 app.add_middleware(
     CORSMiddleware,
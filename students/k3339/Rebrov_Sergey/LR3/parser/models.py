@@ -5,6 +5,11 @@ from sqlmodel import SQLModel, Field
 
 class Page(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    url: str = Field(unique=True, index=True)
     name: str
     description: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    fetched_at: Optional[datetime] = None
     parsed_at: datetime = Field(default_factory=datetime.utcnow)
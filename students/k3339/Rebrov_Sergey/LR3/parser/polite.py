@@ -0,0 +1,264 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import aiohttp
+import requests
+
+SCHED_HOST_RATE = float(os.getenv("SCHED_HOST_RATE", "2"))
+SCHED_HOST_BURST = int(os.getenv("SCHED_HOST_BURST", "2"))
+SCHED_HOST_CONCURRENCY = int(os.getenv("SCHED_HOST_CONCURRENCY", "2"))
+SCHED_MAX_CONCURRENCY = int(os.getenv("SCHED_MAX_CONCURRENCY", "50"))
+SCHED_MAX_RETRIES = int(os.getenv("SCHED_MAX_RETRIES", "2"))
+SCHED_THROTTLE_PAUSE = float(os.getenv("SCHED_THROTTLE_PAUSE", "10"))
+SCHED_MAX_PAUSE = float(os.getenv("SCHED_MAX_PAUSE", "60"))
+ROBOTS_TTL = float(os.getenv("ROBOTS_TTL", "3600"))
+ROBOTS_TIMEOUT = float(os.getenv("ROBOTS_TIMEOUT", "5"))
+ROBOTS_USER_AGENT = os.getenv("ROBOTS_USER_AGENT", "*")
+
+
+class Throttled(Exception):
+    def __init__(self, url, retry_after):
+        super().__init__(url, retry_after)
+        self.url = url
+        self.retry_after = retry_after
+
+
+class Disallowed(Exception):
+    pass
+
+
+def retry_after(headers):
+    value = headers.get("Retry-After")
+    if value is None:
+        return SCHED_THROTTLE_PAUSE
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return SCHED_THROTTLE_PAUSE
+
+
+def check_throttled(url, status, headers):
+    if status in (429, 503):
+        raise Throttled(url, retry_after(headers))
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self):
+        now = time.monotonic()
+        self.refill(now)
+        wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def take(self):
+        now = time.monotonic()
+        self.refill(now)
+        if self.tokens < 1 or self.paused_until > now:
+            return False
+        self.tokens -= 1
+        return True
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class Host:
+    def __init__(self, origin, robots):
+        self.origin = origin
+        self.robots = robots
+        self.expires = time.monotonic() + ROBOTS_TTL
+        self.lock = threading.Lock()
+        delay = robots.crawl_delay(ROBOTS_USER_AGENT)
+        if delay:
+            self.bucket = TokenBucket(min(SCHED_HOST_RATE, 1 / float(delay)), 1)
+            self.concurrency = 1
+        else:
+            self.bucket = TokenBucket(SCHED_HOST_RATE, SCHED_HOST_BURST)
+            self.concurrency = SCHED_HOST_CONCURRENCY
+
+    def allowed(self, url):
+        return self.robots.can_fetch(ROBOTS_USER_AGENT, url)
+
+    def wait(self):
+        with self.lock:
+            return self.bucket.wait()
+
+    def take(self):
+        with self.lock:
+            return self.bucket.take()
+
+    def pause(self, seconds):
+        with self.lock:
+            self.bucket.pause(seconds)
+
+
+def parse_robots(status, text):
+    robots = RobotFileParser()
+    if status in (401, 403):
+        robots.disallow_all = True
+    elif status >= 400:
+        robots.allow_all = True
+    else:
+        robots.parse(text.splitlines())
+    return robots
+
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HostRegistry:
+    def __init__(self):
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def cached(self, origin):
+        host = self.hosts.get(origin)
+        if host is not None and host.expires > time.monotonic():
+            return host
+        return None
+
+    def store(self, origin, status, text):
+        with self.lock:
+            host = self.cached(origin)
+            if host is None:
+                host = self.hosts[origin] = Host(origin, parse_robots(status, text))
+            return host
+
+    async def get_async(self, session, origin):
+        host = self.cached(origin)
+        if host is not None:
+            return host
+        try:
+            timeout = aiohttp.ClientTimeout(total=ROBOTS_TIMEOUT)
+            async with session.get(f"{origin}/robots.txt", timeout=timeout) as response:
+                status, text = response.status, await response.text(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status, text = 404, ""
+        return self.store(origin, status, text)
+
+    def get_sync(self, origin):
+        host = self.cached(origin)
+        if host is not None:
+            return host
+        try:
+            response = requests.get(f"{origin}/robots.txt", timeout=ROBOTS_TIMEOUT)
+            status, text = response.status_code, response.text
+        except requests.RequestException:
+            status, text = 404, ""
+        return self.store(origin, status, text)
+
+
+host_registry = HostRegistry()
+
+
+def group_by_origin(urls):
+    groups = {}
+    for url in dict.fromkeys(urls):
+        groups.setdefault(origin_of(url), deque()).append((url, 0))
+    return groups
+
+
+def requeue(host, queue, url, attempt, error):
+    host.pause(min(error.retry_after, SCHED_MAX_PAUSE))
+    if error.retry_after > SCHED_MAX_PAUSE:
+        return False
+    with host.lock:
+        if attempt < SCHED_MAX_RETRIES:
+            queue.append((url, attempt + 1))
+            return True
+    return False
+
+
+async def crawl_async(session, urls, handle):
+    groups = group_by_origin(urls)
+    hosts = await asyncio.gather(*(host_registry.get_async(session, origin) for origin in groups))
+    limit = asyncio.Semaphore(SCHED_MAX_CONCURRENCY)
+    results = {}
+
+    async def worker(host, queue):
+        while queue:
+            url, attempt = queue.popleft()
+            if not host.allowed(url):
+                results[url] = Disallowed(url)
+                continue
+            while True:
+                await asyncio.sleep(host.wait())
+                async with limit:
+                    if not host.take():
+                        continue
+                    try:
+                        results[url] = await handle(url)
+                    except Throttled as e:
+                        if not requeue(host, queue, url, attempt, e):
+                            results[url] = e
+                    except Exception as e:
+                        results[url] = e
+                break
+
+    await asyncio.gather(*(
+        worker(host, queue)
+        for host, queue in zip(hosts, groups.values())
+        for _ in range(min(host.concurrency, len(queue)))
+    ))
+    return [results[url] for url in urls]
+
+
+def crawl_threads(urls, handle):
+    groups = group_by_origin(urls)
+    hosts = [host_registry.get_sync(origin) for origin in groups]
+    limit = threading.Semaphore(SCHED_MAX_CONCURRENCY)
+    results = {}
+
+    def worker(host, queue):
+        while True:
+            with host.lock:
+                if not queue:
+                    return
+                url, attempt = queue.popleft()
+            if not host.allowed(url):
+                results[url] = Disallowed(url)
+                continue
+            while True:
+                time.sleep(host.wait())
+                with limit:
+                    if not host.take():
+                        continue
+                    try:
+                        results[url] = handle(url)
+                    except Throttled as e:
+                        if not requeue(host, queue, url, attempt, e):
+                            results[url] = e
+                    except Exception as e:
+                        results[url] = e
+                break
+
+    threads = [
+        threading.Thread(target=worker, args=(host, queue))
+        for host, queue in zip(hosts, groups.values())
+        for _ in range(min(host.concurrency, len(queue)))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [results[url] for url in urls]
@@ -1,32 +1,82 @@
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 
 from celery_worker import celery_app
-from connection import get_session
+from fetcher import fetcher
+from head import conditional_headers, fetch_meta, read_head, revalidated, unchanged
+from jobs import release
 from models import Page
+from polite import check_throttled, crawl_async
+from writer import page_validators, touch_pages, upsert_pages
 
 
-@celery_app.task
-def parse_and_save_task(url: str):
-    asyncio.run(parse(url))
+@celery_app.task(bind=True)
+def parse_and_save_task(self, url: str):
+    try:
+        return fetcher.run(parse(url))
+    finally:
+        release([url], self.request.id)
+
+
+@celery_app.task(bind=True)
+def parse_chunk_task(self, urls):
+    try:
+        return fetcher.run(parse_many(urls))
+    finally:
+        release(urls, self.request.id)
+
+
+async def fetch(session, url, known=None):
+    async with session.get(url, headers=conditional_headers(known)) as response:
+        if response.status == 304:
+            return {"url": url, **revalidated(known, response.headers)}
+        check_throttled(url, response.status, response.headers)
+        head = await read_head(response)
+    digest = head.digest()
+    if unchanged(known, digest):
+        return {"url": url, **revalidated(known, response.headers)}
+    name, description = head.result()
+    return Page(
+        url=url,
+        name=name or "No name",
+        description=description or "No description",
+        **fetch_meta(response.headers, digest),
+    )
+
+
+async def save_pages(pages, touched=()):
+    if pages:
+        await asyncio.to_thread(upsert_pages, [page.model_dump(exclude={"id"}) for page in pages])
+    if touched:
+        await asyncio.to_thread(touch_pages, touched)
 
 
 async def parse(url: str):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            html = await response.text()
+    session = await fetcher.client()
+    known = (await asyncio.to_thread(page_validators, [url])).get(url)
+    [page] = await crawl_async(session, [url], lambda url: fetch(session, url, known))
+    if isinstance(page, Exception):
+        raise page
+    if isinstance(page, dict):
+        await save_pages([], [page])
+        return {"url": url, "name": None, "modified": False}
+    await save_pages([page])
+
+    return {"url": url, "name": page.name, "modified": True}
 
-    soup = BeautifulSoup(html, "html.parser")
 
-    name = soup.title.string.strip() if soup.title else "No name"
+async def parse_many(urls):
+    session = await fetcher.client()
+    known = await asyncio.to_thread(page_validators, urls)
+    responses = await crawl_async(session, urls, lambda url: fetch(session, url, known.get(url)))
 
-    description = "No description"
-    meta_tag = soup.find("meta", attrs={"name": "description"})
-    if meta_tag and meta_tag.get("content"):
-        description = meta_tag["content"].strip()
+    pages, touched, failed = [], [], []
+    for url, page in zip(urls, responses):
+        if isinstance(page, Exception):
+            failed.append({"url": url, "error": repr(page)})
+        elif isinstance(page, dict):
+            touched.append(page)
+        else:
+            pages.append(page)
+    await save_pages(pages, touched)
 
-    with get_session() as session:
-        page = Page(name=name, description=description)
-        session.merge(page)
-        session.commit()
+    return {"parsed": len(pages), "skipped": len(touched), "failed": failed}
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+import aiohttp
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import polite
+from polite import Throttled, check_throttled, crawl_async, crawl_threads
+
+RETRY_AFTER = 1
+URLS_PER_HOST = 2
+
+
+def make_app(throttled, hits):
+    async def handler(request):
+        if request.path == "/robots.txt":
+            return web.Response(status=404)
+        hits.append(time.monotonic())
+        if throttled:
+            return web.Response(status=429, headers={"Retry-After": str(RETRY_AFTER)})
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    return app
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    monkeypatch.setattr(polite, "SCHED_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(polite, "SCHED_MAX_RETRIES", 1)
+    monkeypatch.setattr(polite, "SCHED_HOST_RATE", 100)
+    monkeypatch.setattr(polite, "SCHED_HOST_BURST", 10)
+    monkeypatch.setattr(polite, "host_registry", polite.HostRegistry())
+    hits = {"throttled": [], "free": []}
+    started = threading.Event()
+    state = {"servers": []}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        state["loop"] = loop
+        for name in hits:
+            server = TestServer(make_app(name == "throttled", hits[name]), loop=loop)
+            loop.run_until_complete(server.start_server())
+            state["servers"].append(server)
+            state[name] = str(server.make_url("")).rstrip("/")
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    urls = [f"{state[name]}/{i}" for i in range(URLS_PER_HOST) for name in ("throttled", "free")]
+    yield urls, hits
+    for server in state["servers"]:
+        asyncio.run_coroutine_threadsafe(server.close(), state["loop"]).result()
+    state["loop"].call_soon_threadsafe(state["loop"].stop)
+
+
+def check_results(urls, results, hits, start):
+    assert results[1::2] == ["ok"] * URLS_PER_HOST
+    assert all(isinstance(result, Throttled) for result in results[::2])
+    assert max(hits["free"]) - start < RETRY_AFTER / 2
+    assert max(hits["throttled"]) - start >= RETRY_AFTER
+
+
+def test_throttled_host_does_not_delay_free_host_async(servers):
+    urls, hits = servers
+
+    async def main():
+        async with aiohttp.ClientSession() as session:
+            async def handle(url):
+                async with session.get(url) as response:
+                    check_throttled(url, response.status, response.headers)
+                    return await response.text()
+            return await crawl_async(session, urls, handle)
+
+    start = time.monotonic()
+    check_results(urls, asyncio.run(main()), hits, start)
+
+
+def test_throttled_host_does_not_delay_free_host_threads(servers):
+    urls, hits = servers
+
+    def handle(url):
+        response = requests.get(url)
+        check_throttled(url, response.status_code, response.headers)
+        return response.text
+
+    start = time.monotonic()
+    check_results(urls, crawl_threads(urls, handle), hits, start)
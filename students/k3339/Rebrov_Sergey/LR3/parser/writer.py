@@ -0,0 +1,37 @@
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from connection import engine
+from models import Page
+
+
+def page_validators(urls):
+    statement = select(Page.url, Page.etag, Page.last_modified, Page.content_hash).where(Page.url.in_(urls))
+    with engine.connect() as conn:
+        return {row.url: row._asdict() for row in conn.execute(statement)}
+
+
+def upsert_pages(rows):
+    insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(Page).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["url"],
+        set_={
+            column.name: statement.excluded[column.name]
+            for column in Page.__table__.columns
+            if column.name not in ("id", "url")
+        },
+    )
+    with engine.begin() as conn:
+        conn.execute(statement)
+
+
+def touch_pages(rows):
+    statement = update(Page).where(Page.url == bindparam("page_url")).values(
+        etag=bindparam("page_etag"),
+        last_modified=bindparam("page_last_modified"),
+        fetched_at=bindparam("page_fetched_at"),
+    )
+    params = [{f"page_{name}": value for name, value in row.items()} for row in rows]
+    with engine.begin() as conn:
+        conn.execute(statement, params)